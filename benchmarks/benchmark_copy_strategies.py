@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cart_submission_core as tool
+
+def create_sparse_xci(path, size):
+    with open(path, 'wb') as f:
+        f.truncate(size)
+        for offset in range(0, size, size // 16):
+            f.seek(offset)
+            f.write(os.urandom(1048576))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FullXCI copy strategies on a large sparse test file")
+    parser.add_argument("--size", type=int, default=4096, help="Test file size in MB")
+    parser.add_argument("--dir", default=None, help="Directory to create the test files in, defaults to the system temp directory")
+    args = parser.parse_args()
+
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as work_dir:
+        source_path = os.path.join(work_dir, "source.xci")
+        create_sparse_xci(source_path, args.size * 1048576)
+        source_size = os.path.getsize(source_path)
+
+        print(f"{'Strategy':<16}{'Operation':<12}{'Seconds':>10}{'MB/s':>10}")
+        for strategy in tool.COPY_STRATEGIES:
+            if not tool.copy_strategy_available(strategy):
+                print(f"{strategy:<16}{'unavailable':<12}")
+                continue
+
+            for operation, src_offset, dst_offset in (("generate", 0, tool.FULL_XCI_DATA_OFFSET), ("truncate", tool.FULL_XCI_DATA_OFFSET, 0)):
+                target_path = os.path.join(work_dir, f"{strategy}-{operation}.xci")
+                length = source_size - src_offset
+
+                start = time.perf_counter()
+                try:
+                    with open(source_path, 'rb', buffering=0) as src, open(target_path, 'wb') as dst:
+                        tool.copy_range(src, dst, src_offset, dst_offset, length, strategies=(strategy,))
+                        os.fsync(dst.fileno())
+                except OSError as e:
+                    print(f"{strategy:<16}{operation:<12}{'failed':>10}  {e}")
+                    continue
+                finally:
+                    if os.path.exists(target_path):
+                        os.remove(target_path)
+                elapsed = time.perf_counter() - start
+
+                print(f"{strategy:<16}{operation:<12}{elapsed:>10.2f}{length / 1048576 / elapsed:>10.0f}")
+
+if __name__ == '__main__':
+    main()
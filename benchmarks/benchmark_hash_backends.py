@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cart_submission_core as tool
+
+def create_test_xci(path, size):
+    block = os.urandom(8388608)
+    with open(path, 'wb') as f:
+        for offset in range(0, size, len(block)):
+            f.write(block[:size - offset])
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the XCI hashing backends on the same file")
+    parser.add_argument("--file", help="Existing XCI to hash, a random test file is created otherwise")
+    parser.add_argument("--size", type=int, default=2048, help="Test file size in MB")
+    parser.add_argument("--dir", default=None, help="Directory to create the test file in, defaults to the system temp directory")
+    parser.add_argument("--block-size", type=int, default=8, help="Block size in MB")
+    parser.add_argument("--queue-depth", type=int, default=4, help="Reads kept in flight by the prefetch backend")
+    parser.add_argument("--repeat", type=int, default=2, help="Runs per backend, the best one is reported")
+    args = parser.parse_args()
+
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as work_dir:
+        xci_path = args.file
+        if not xci_path:
+            xci_path = os.path.join(work_dir, "test.xci")
+            create_test_xci(xci_path, args.size * 1048576)
+        xci_size = os.path.getsize(xci_path)
+
+        print(f"{'Backend':<12}{'Seconds':>10}{'MB/s':>10}  SHA256")
+        for backend in tool.HASH_BACKENDS:
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results, _, _ = tool.hash_xci(xci_path, block_size=args.block_size * 1048576, quiet=True, backend=backend, queue_depth=args.queue_depth)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            print(f"{backend:<12}{best:>10.2f}{xci_size / 1048576 / best:>10.0f}  {results['SHA256']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import ctypes
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cart_submission_core as tool
+
+libc = ctypes.CDLL(None, use_errno=True)
+libc.mmap.restype = ctypes.c_void_p
+libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p]
+
+def create_file(path, size):
+    block = os.urandom(8388608)
+    with open(path, 'wb') as f:
+        for offset in range(0, size, len(block)):
+            f.write(block[:size - offset])
+        f.flush()
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+def resident_fraction(path):
+    size = os.path.getsize(path)
+    pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    with open(path, 'rb') as f:
+        address = libc.mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, f.fileno(), 0)
+    if address in (None, ctypes.c_void_p(-1).value):
+        raise OSError(ctypes.get_errno(), "mmap failed")
+
+    try:
+        vector = (ctypes.c_ubyte * pages)()
+        if libc.mincore(address, size, vector) != 0:
+            raise OSError(ctypes.get_errno(), "mincore failed")
+        return sum(page & 1 for page in vector) / pages
+    finally:
+        libc.munmap(address, size)
+
+def read_file(path):
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        while f.read(8388608):
+            pass
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how much of the page cache XCI hashing takes over in each cache mode (Linux only)")
+    parser.add_argument("--size", type=int, default=2048, help="Test XCI size in MB")
+    parser.add_argument("--hot-size", type=int, default=256, help="Size in MB of a file standing in for other jobs' cached data")
+    parser.add_argument("--dir", default=None, help="Directory to create the test files in, defaults to the system temp directory")
+    args = parser.parse_args()
+
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as work_dir:
+        xci_path = os.path.join(work_dir, "test.xci")
+        hot_path = os.path.join(work_dir, "hot.bin")
+        create_file(xci_path, args.size * 1048576)
+        create_file(hot_path, args.hot_size * 1048576)
+
+        print(f"{'Mode':<8}{'Hash s':>8}{'XCI cached':>12}{'Hot cached':>12}{'Hot reread s':>14}")
+        for cache_mode in tool.CACHE_MODES:
+            with open(xci_path, 'rb') as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            read_file(hot_path)
+
+            start = time.perf_counter()
+            tool.hash_xci(xci_path, quiet=True, cache_mode=cache_mode)
+            elapsed = time.perf_counter() - start
+
+            xci_cached = resident_fraction(xci_path)
+            hot_cached = resident_fraction(hot_path)
+            print(f"{cache_mode:<8}{elapsed:>8.2f}{xci_cached:>12.0%}{hot_cached:>12.0%}{read_file(hot_path):>14.2f}")
+
+if __name__ == '__main__':
+    main()
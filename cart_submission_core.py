@@ -0,0 +1,2667 @@
+import sys
+import hashlib
+import zlib
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+import os
+import io
+import mmap
+import subprocess
+import platform
+import time
+import csv
+import re
+import threading
+import queue
+import struct
+import errno
+import sqlite3
+import json
+import argparse
+from contextlib import closing
+from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+INITIAL_AREA_SIZE = 512
+FULL_XCI_PADDING_SIZE = 3584
+FULL_XCI_DATA_OFFSET = INITIAL_AREA_SIZE + FULL_XCI_PADDING_SIZE
+READ_BLOCK_SIZE = 8388608
+PROGRESS_INTERVAL = 0.25
+HASH_CACHE_MAX_ENTRIES = 5000
+METADATA_CACHE_MAX_ENTRIES = 5000
+DIRECT_IO_ALIGNMENT = 4096
+PREFETCH_QUEUE_DEPTH = 4
+SFV_VERIFY_JOBS = 4
+METADATA_JOBS = os.cpu_count() or 4
+TITLE_FIELDS = ("base_title_ids", "update_title_ids", "updates", "versions", "titles", "languages")
+CACHE_MODES = ("drop", "keep", "direct")
+CLI_COMMANDS = ("submit", "batch", "untrim", "rar", "index", "sfv", "titles", "titledb", "verify")
+
+class HashCancelled(Exception):
+    pass
+
+def data_segments(fd, offset, length):
+    end = offset + length
+    if not hasattr(os, 'SEEK_DATA'):
+        yield offset, end
+        return
+
+    position = offset
+    while position < end:
+        try:
+            data_start = os.lseek(fd, position, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                return
+            if e.errno in COPY_FALLBACK_ERRNOS:
+                yield position, end
+                return
+            raise
+        if data_start >= end:
+            return
+
+        data_end = min(os.lseek(fd, data_start, os.SEEK_HOLE), end)
+        yield data_start, data_end
+        position = data_end
+
+def advise_file(fd, offset, length, advice_name):
+    advice = getattr(os, advice_name, None)
+    if advice is not None:
+        os.posix_fadvise(fd, offset, length, advice)
+
+def drop_file_cache(file):
+    file.flush()
+    if hasattr(os, 'fdatasync'):
+        os.fdatasync(file.fileno())
+    advise_file(file.fileno(), 0, 0, "POSIX_FADV_DONTNEED")
+
+def is_direct_io(file):
+    return isinstance(file, io.FileIO) and fcntl is not None and hasattr(os, 'O_DIRECT') and bool(fcntl.fcntl(file.fileno(), fcntl.F_GETFL) & os.O_DIRECT)
+
+def open_input(file_path, cache_mode="drop", buffering=0):
+    if cache_mode == "direct" and buffering == 0 and hasattr(os, 'O_DIRECT'):
+        try:
+            return open(os.open(file_path, os.O_RDONLY | os.O_DIRECT), 'rb', buffering=0)
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                raise
+    return open(file_path, 'rb', buffering=buffering)
+
+def file_holes(file, length=None):
+    if not isinstance(file, io.FileIO) or not hasattr(os, 'SEEK_DATA'):
+        return []
+
+    position = file.tell()
+    end = position + length if length is not None else os.fstat(file.fileno()).st_size
+    holes = []
+    previous_end = position
+    for data_start, data_end in data_segments(file.fileno(), position, end - position):
+        if data_start > previous_end:
+            holes.append((previous_end, data_start))
+        previous_end = data_end
+    if previous_end < end:
+        holes.append((previous_end, end))
+
+    file.seek(position)
+    return holes
+
+class ChunkedReader:
+    def __init__(self, file, block_size=READ_BLOCK_SIZE, length=None, drop_behind=False):
+        self.file = file
+        self.buffer = mmap.mmap(-1, block_size)
+        self.view = memoryview(self.buffer)
+        self.remaining = length
+        self.holes = file_holes(file, length)
+        self.zeros = memoryview(bytes(block_size)) if self.holes else None
+        self.direct = is_direct_io(file)
+        self.drop_behind = drop_behind
+        if drop_behind:
+            advise_file(file.fileno(), file.tell(), length or 0, "POSIX_FADV_SEQUENTIAL")
+
+    def readinto(self, buffer):
+        limit = None
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return 0
+            if len(buffer) > self.remaining:
+                limit = self.remaining
+                if self.direct:
+                    aligned_limit = -(-limit // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+                    buffer = memoryview(buffer)[:min(len(buffer), aligned_limit)]
+                else:
+                    buffer = memoryview(buffer)[:limit]
+
+        if self.holes:
+            position = self.file.tell()
+            hole_start, hole_end = self.holes[0]
+            if position >= hole_start:
+                size = min(len(buffer), len(self.zeros), hole_end - position)
+                memoryview(buffer)[:size] = self.zeros[:size]
+                self.file.seek(position + size)
+                if position + size >= hole_end:
+                    del self.holes[0]
+                if self.remaining is not None:
+                    self.remaining -= size
+                return size
+            if len(buffer) > hole_start - position:
+                buffer = memoryview(buffer)[:hole_start - position]
+
+        position = self.file.tell() if self.drop_behind else 0
+        size = self.file.readinto(buffer) or 0
+        if limit is not None:
+            size = min(size, limit)
+        if self.drop_behind and size:
+            advise_file(self.file.fileno(), position, size, "POSIX_FADV_DONTNEED")
+
+        if self.remaining is not None:
+            self.remaining -= size
+        return size
+
+    def __iter__(self):
+        while size := self.readinto(self.buffer):
+            yield self.view[:size]
+
+    def feed(self, pipeline):
+        return pipeline.update_from(self)
+
+class BufferedChunkReader:
+    def __init__(self, file, block_size=READ_BLOCK_SIZE, length=None, drop_behind=False):
+        self.file = file
+        self.block_size = block_size
+        self.remaining = length
+        self.position = file.tell()
+        self.drop_behind = drop_behind
+        if drop_behind:
+            advise_file(file.fileno(), self.position, length or 0, "POSIX_FADV_SEQUENTIAL")
+
+    def feed(self, pipeline):
+        size = self.block_size if self.remaining is None else min(self.block_size, self.remaining)
+        chunk = self.file.read(size) if size > 0 else b""
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+        if self.drop_behind and chunk:
+            advise_file(self.file.fileno(), self.position, len(chunk), "POSIX_FADV_DONTNEED")
+        self.position += len(chunk)
+        if chunk:
+            pipeline.update(chunk)
+        return len(chunk)
+
+class MappedReader:
+    def __init__(self, file, block_size=READ_BLOCK_SIZE, length=None, drop_behind=False):
+        self.fd = file.fileno()
+        self.block_size = block_size
+        self.drop_behind = drop_behind
+        self.position = file.tell()
+        self.end = self.position + length if length is not None else os.fstat(file.fileno()).st_size
+        self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.end > self.position else None
+        self.view = memoryview(self.mapping) if self.mapping else None
+        self.advise("MADV_SEQUENTIAL", self.position, self.end - self.position)
+        if drop_behind:
+            advise_file(self.fd, self.position, self.end - self.position, "POSIX_FADV_SEQUENTIAL")
+
+    def advise(self, option_name, start, length):
+        option = getattr(mmap, option_name, None)
+        if option is None or self.mapping is None or not hasattr(self.mapping, 'madvise'):
+            return
+
+        aligned_start = start - start % mmap.PAGESIZE
+        self.mapping.madvise(option, aligned_start, length + start - aligned_start)
+
+    def feed(self, pipeline):
+        if self.position >= self.end:
+            return 0
+
+        start = self.position
+        size = min(self.block_size, self.end - start)
+        self.position += size
+        return pipeline.update_view(self.view[start:start + size], lambda: self.release(start, size))
+
+    def release(self, start, size):
+        self.advise("MADV_DONTNEED", start, size)
+        if self.drop_behind:
+            advise_file(self.fd, start, size, "POSIX_FADV_DONTNEED")
+
+class PrefetchReader:
+    def __init__(self, file, block_size=READ_BLOCK_SIZE, length=None, drop_behind=False, queue_depth=PREFETCH_QUEUE_DEPTH):
+        self.file = file
+        self.fd = file.fileno()
+        self.block_size = block_size
+        self.queue_depth = max(1, queue_depth)
+        self.position = file.tell()
+        self.end = self.position + length if length is not None else os.fstat(self.fd).st_size
+        self.drop_behind = drop_behind
+        self.direct = is_direct_io(file)
+        self.free_buffers = []
+        self.in_flight = deque()
+        self.executor = ThreadPoolExecutor(max_workers=self.queue_depth)
+        if drop_behind:
+            advise_file(self.fd, self.position, self.end - self.position, "POSIX_FADV_SEQUENTIAL")
+
+    def read_block(self, buffer, offset, size):
+        read_size = -(-size // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT if self.direct else size
+        view = memoryview(buffer)[:min(read_size, len(buffer))]
+
+        if hasattr(os, 'preadv'):
+            total = 0
+            while total < len(view):
+                count = os.preadv(self.fd, [view[total:]], offset + total)
+                if not count:
+                    break
+                total += count
+        else:
+            with open(self.file.name, 'rb', buffering=0) as positioned_file:
+                positioned_file.seek(offset)
+                total = positioned_file.readinto(view) or 0
+
+        if self.drop_behind and total:
+            advise_file(self.fd, offset, total, "POSIX_FADV_DONTNEED")
+        return min(total, size)
+
+    def schedule(self):
+        while len(self.in_flight) < self.queue_depth and self.position < self.end:
+            buffer = self.free_buffers.pop() if self.free_buffers else mmap.mmap(-1, self.block_size)
+            size = min(self.block_size, self.end - self.position)
+            self.in_flight.append((buffer, self.executor.submit(self.read_block, buffer, self.position, size)))
+            self.position += size
+
+    def feed(self, pipeline):
+        self.schedule()
+        if not self.in_flight:
+            self.close()
+            return 0
+
+        buffer, future = self.in_flight.popleft()
+        size = future.result()
+        if not size:
+            self.close()
+            return 0
+        return pipeline.update_view(memoryview(buffer)[:size], lambda: self.free_buffers.append(buffer))
+
+    def close(self):
+        for _, future in self.in_flight:
+            future.cancel()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.in_flight.clear()
+
+class PaddingReader:
+    def __init__(self, length, fill=0xFF, block_size=READ_BLOCK_SIZE):
+        self.remaining = length
+        self.block = memoryview(bytes([fill]) * min(block_size, length))
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.block), self.remaining)
+        memoryview(buffer)[:size] = self.block[:size]
+        self.remaining -= size
+        return size
+
+    def __iter__(self):
+        while self.remaining > 0:
+            size = min(len(self.block), self.remaining)
+            self.remaining -= size
+            yield self.block[:size]
+
+    def feed(self, pipeline):
+        return pipeline.update_from(self)
+
+HASH_READERS = {
+    "readinto": ChunkedReader,
+    "mmap": MappedReader,
+    "prefetch": PrefetchReader,
+    "buffered": BufferedChunkReader
+}
+HASH_BACKENDS = tuple(HASH_READERS)
+
+class ProgressReporter:
+    def __init__(self, label, total_size, callback=None, interval=PROGRESS_INTERVAL, quiet=False):
+        self.label = label
+        self.total_size = total_size
+        self.callback = callback
+        self.interval = interval
+        self.quiet = quiet
+        self.processed_size = 0
+        self.last_report = 0.0
+
+    def advance(self, size, label=None):
+        self.processed_size += size
+        if label:
+            self.label = label
+
+        now = time.monotonic()
+        if now - self.last_report < self.interval and self.processed_size < self.total_size:
+            return
+        self.last_report = now
+
+        if self.callback:
+            self.callback(self.processed_size, self.total_size)
+
+        if self.quiet:
+            return
+
+        progress = (self.processed_size / self.total_size) * 100 if self.total_size else 100
+        sys.stdout.write(f"\r{self.label} {progress:.0f}%")
+        sys.stdout.flush()
+
+FICLONERANGE = 0x4020940D
+COPY_STEP_SIZE = 67108864
+COPY_STRATEGIES = ("reflink", "copy_file_range", "sendfile", "chunked")
+COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTTY, errno.EBADF, errno.EPERM}
+
+def copy_strategy_available(strategy):
+    if strategy == "reflink":
+        return fcntl is not None and platform.system() == "Linux"
+    if strategy == "copy_file_range":
+        return hasattr(os, "copy_file_range")
+    if strategy == "sendfile":
+        return hasattr(os, "sendfile") and platform.system() == "Linux"
+    return strategy == "chunked"
+
+def copy_range(src_file, dst_file, src_offset, dst_offset, length, reporter=None, strategies=COPY_STRATEGIES):
+    dst_file.flush()
+    src_fd = src_file.fileno()
+    dst_fd = dst_file.fileno()
+    segments = [(start - src_offset, end - src_offset) for start, end in data_segments(src_fd, src_offset, length)] + [(length, length)]
+    copied = 0
+    reported = 0
+
+    for strategy in strategies:
+        if not copy_strategy_available(strategy):
+            continue
+
+        try:
+            buffer = mmap.mmap(-1, READ_BLOCK_SIZE) if strategy == "chunked" else None
+            for segment_start, segment_end in segments:
+                copied = max(copied, segment_start)
+                while copied < segment_end:
+                    step = min(COPY_STEP_SIZE, segment_end - copied)
+                    if strategy == "reflink":
+                        fcntl.ioctl(dst_fd, FICLONERANGE, struct.pack('qQQQ', src_fd, src_offset + copied, segment_end - copied, dst_offset + copied))
+                        size = segment_end - copied
+                    elif strategy == "copy_file_range":
+                        size = os.copy_file_range(src_fd, dst_fd, step, src_offset + copied, dst_offset + copied)
+                    elif strategy == "sendfile":
+                        os.lseek(dst_fd, dst_offset + copied, os.SEEK_SET)
+                        size = os.sendfile(dst_fd, src_fd, src_offset + copied, step)
+                    else:
+                        src_file.seek(src_offset + copied)
+                        dst_file.seek(dst_offset + copied)
+                        size = src_file.readinto(memoryview(buffer)[:min(step, len(buffer))]) or 0
+                        dst_file.write(memoryview(buffer)[:size])
+
+                    if not size:
+                        raise EOFError(f"Source ended {segment_end - copied} bytes early")
+
+                    copied += size
+                    if reporter:
+                        reporter.advance(copied - reported)
+                    reported = copied
+
+            if reporter and reported < copied:
+                reporter.advance(copied - reported)
+            dst_file.flush()
+            if os.fstat(dst_fd).st_size < dst_offset + length:
+                os.ftruncate(dst_fd, dst_offset + length)
+            return strategy
+        except OSError as e:
+            if e.errno not in COPY_FALLBACK_ERRNOS:
+                raise
+
+    raise OSError(errno.ENOTSUP, "No copy strategy succeeded")
+
+class Crc32Digest:
+    def __init__(self):
+        self.crc32 = 0
+
+    def update(self, chunk):
+        self.crc32 = zlib.crc32(chunk, self.crc32)
+
+    def hexdigest(self):
+        return format(self.crc32 & 0xFFFFFFFF, '08x')
+
+class MultiHasher:
+    def __init__(self):
+        self.size = 0
+        self.digests = {
+            "CRC32": Crc32Digest(),
+            "MD5": hashlib.md5(),
+            "SHA1": hashlib.sha1(),
+            "SHA256": hashlib.sha256()
+        }
+
+    def update(self, chunk):
+        self.size += len(chunk)
+        for digest in self.digests.values():
+            digest.update(chunk)
+
+    def results(self):
+        results = {"File Size": str(self.size)}
+        for name, digest in self.digests.items():
+            results[name] = digest.hexdigest()
+        return results
+
+class SharedBuffer:
+    def __init__(self, size):
+        self.data = mmap.mmap(-1, size)
+        self.view = memoryview(self.data)
+        self.chunk = None
+        self.release = None
+        self.pending = 0
+        self.lock = threading.Lock()
+
+class DigestWorker(threading.Thread):
+    def __init__(self, name, digest, free_buffers):
+        super().__init__(daemon=True)
+        self.name = name
+        self.digest = digest
+        self.free_buffers = free_buffers
+        self.queue = queue.Queue()
+        self.busy_time = 0.0
+        self.error = None
+
+    def run(self):
+        while (buffer := self.queue.get()) is not None:
+            if self.error is None:
+                start = time.perf_counter()
+                try:
+                    self.digest.update(buffer.chunk)
+                except Exception as e:
+                    self.error = e
+                self.busy_time += time.perf_counter() - start
+
+            with buffer.lock:
+                buffer.pending -= 1
+                if buffer.pending == 0:
+                    self.free_buffers.put(buffer)
+
+class FileSink:
+    def __init__(self, file, block_size=READ_BLOCK_SIZE):
+        self.file = file
+        self.zeros = bytes(block_size)
+
+    def update(self, chunk):
+        if len(chunk) <= len(self.zeros) and self.zeros.startswith(chunk):
+            self.file.seek(len(chunk), os.SEEK_CUR)
+        else:
+            self.file.write(chunk)
+
+    def close(self):
+        self.file.truncate()
+
+class ParallelHashPipeline:
+    def __init__(self, hashers, buffer_count=4, buffer_size=READ_BLOCK_SIZE, sinks=()):
+        self.hashers = hashers
+        self.free_buffers = queue.Queue()
+        for _ in range(buffer_count):
+            self.free_buffers.put(SharedBuffer(buffer_size))
+
+        self.workers = [
+            DigestWorker(name, digest, self.free_buffers)
+            for hasher in hashers for name, digest in hasher.digests.items()
+        ] + [DigestWorker("Write", sink, self.free_buffers) for sink in sinks]
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def acquire(self):
+        buffer = self.free_buffers.get()
+        if buffer.release:
+            buffer.release()
+        buffer.chunk = None
+        buffer.release = None
+        return buffer
+
+    def dispatch(self, buffer, chunk):
+        buffer.chunk = chunk
+        for hasher in self.hashers:
+            hasher.size += len(chunk)
+        buffer.pending = len(self.workers)
+        for worker in self.workers:
+            worker.queue.put(buffer)
+
+    def check_workers(self):
+        for worker in self.workers:
+            if worker.error is not None:
+                raise worker.error
+
+    def update(self, chunk):
+        self.check_workers()
+        view = memoryview(chunk)
+        while view:
+            buffer = self.acquire()
+            length = min(len(view), len(buffer.data))
+            buffer.view[:length] = view[:length]
+            self.dispatch(buffer, buffer.view[:length])
+            view = view[length:]
+
+    def update_from(self, reader):
+        self.check_workers()
+        buffer = self.acquire()
+        length = reader.readinto(buffer.data)
+        if not length:
+            self.free_buffers.put(buffer)
+            return 0
+        self.dispatch(buffer, buffer.view[:length])
+        return length
+
+    def update_view(self, view, release=None):
+        self.check_workers()
+        buffer = self.acquire()
+        buffer.release = release
+        self.dispatch(buffer, view)
+        return len(view)
+
+    def close(self):
+        for worker in self.workers:
+            worker.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+        while not self.free_buffers.empty():
+            self.acquire()
+
+        self.check_workers()
+
+    def timings(self):
+        timings = {}
+        for worker in self.workers:
+            timings[worker.name] = timings.get(worker.name, 0.0) + worker.busy_time
+        return timings
+
+class HashCache:
+    def __init__(self, path, max_entries=HASH_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self.connect()) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "path TEXT, device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, variant TEXT, "
+                "results TEXT, last_used REAL, PRIMARY KEY (path, device, inode, size, mtime_ns, variant))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+            db.commit()
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def file_identity(self, file_path):
+        stat = os.stat(file_path)
+        return (os.path.realpath(file_path), stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def get(self, file_path, variant=""):
+        key = self.file_identity(file_path) + (variant,)
+        where = "path = ? AND device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND variant = ?"
+
+        with closing(self.connect()) as db:
+            row = db.execute(f"SELECT results FROM hashes WHERE {where}", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute(f"UPDATE hashes SET last_used = ? WHERE {where}", (time.time(),) + key)
+            db.commit()
+
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, file_path, results, variant=""):
+        identity = self.file_identity(file_path)
+
+        with closing(self.connect()) as db:
+            db.execute("DELETE FROM hashes WHERE path = ? AND variant = ?", (identity[0], variant))
+            db.execute("INSERT INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", identity + (variant, json.dumps(results), time.time()))
+            db.execute("DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            db.commit()
+
+    def clear(self):
+        with closing(self.connect()) as db:
+            db.execute("DELETE FROM hashes")
+            db.commit()
+
+def open_hash_cache():
+    return HashCache(os.path.join(settings_directory(), "hash_cache.sqlite3"))
+
+def full_xci_cache_variant(initial_area, variant=""):
+    return variant + "full:" + hashlib.sha256(initial_area).hexdigest()
+
+def hash_xci(default_xci_path, initial_area_path=None, progress_callback=None, is_cancelled=None, block_size=READ_BLOCK_SIZE, cache=None, verify=False, quiet=False, untrim=False, backend="readinto", cache_mode="drop", queue_depth=PREFETCH_QUEUE_DEPTH):
+    initial_area = None
+    if initial_area_path:
+        with open(initial_area_path, 'rb') as initial_area_file:
+            initial_area = initial_area_file.read()
+
+    padding_size = read_xci_header(default_xci_path).padding_size if untrim else 0
+    variant = "untrimmed:" if padding_size else ""
+
+    if cache and not verify:
+        default_results = cache.get(default_xci_path, variant)
+        full_xci_results = cache.get(default_xci_path, full_xci_cache_variant(initial_area, variant)) if initial_area is not None else None
+        if default_results and (initial_area is None or full_xci_results):
+            if not quiet:
+                print(f"Loaded cached hashes for: {default_xci_path}")
+            return default_results, full_xci_results, {}
+
+    default_hasher = MultiHasher()
+    hashers = [default_hasher]
+
+    full_xci_hasher = None
+    if initial_area is not None:
+        full_xci_hasher = MultiHasher()
+        full_xci_hasher.update(initial_area)
+        full_xci_hasher.update(b'\x00' * FULL_XCI_PADDING_SIZE)
+        hashers.append(full_xci_hasher)
+
+    reporter = ProgressReporter("Calculating hashes for XCI...", os.path.getsize(default_xci_path) + padding_size, progress_callback, quiet=quiet)
+
+    with open_input(default_xci_path, cache_mode, -1 if backend == "buffered" else 0) as default_xci_file:
+        if backend == "prefetch":
+            readers = [PrefetchReader(default_xci_file, block_size, drop_behind=cache_mode != "keep", queue_depth=queue_depth)]
+        else:
+            readers = [HASH_READERS[backend](default_xci_file, block_size, drop_behind=cache_mode != "keep")]
+        if padding_size:
+            readers.append(PaddingReader(padding_size, block_size=block_size))
+
+        try:
+            with ParallelHashPipeline(hashers, buffer_size=block_size) as pipeline:
+                for reader in readers:
+                    while True:
+                        if is_cancelled and is_cancelled():
+                            if not quiet:
+                                print("\nHash calculation cancelled")
+                            raise HashCancelled()
+
+                        chunk_size = reader.feed(pipeline)
+                        if not chunk_size:
+                            break
+                        reporter.advance(chunk_size)
+        finally:
+            if backend == "prefetch":
+                readers[0].close()
+
+    timings = pipeline.timings()
+    if not quiet:
+        print("\nCompleted hash calculation for XCI")
+        print("Digest timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+
+    default_results = default_hasher.results()
+    full_xci_results = full_xci_hasher.results() if full_xci_hasher else None
+
+    if cache:
+        cache.put(default_xci_path, default_results, variant)
+        if full_xci_results:
+            cache.put(default_xci_path, full_xci_results, full_xci_cache_variant(initial_area, variant))
+
+    return default_results, full_xci_results, timings
+
+def file_crc32(file_path, block_size=READ_BLOCK_SIZE, is_cancelled=None):
+    crc32 = Crc32Digest()
+    with open(file_path, 'rb', buffering=0) as f:
+        for chunk in ChunkedReader(f, block_size):
+            if is_cancelled and is_cancelled():
+                raise HashCancelled()
+            crc32.update(chunk)
+    return crc32.hexdigest()
+
+@dataclass
+class SfvResult:
+    __slots__ = ("file_name", "expected_crc32", "actual_crc32", "size", "status")
+    file_name: str
+    expected_crc32: str
+    actual_crc32: str
+    size: int
+    status: str
+
+    @property
+    def failed(self):
+        return self.status in ("mismatch", "missing")
+
+def parse_sfv(sfv_path):
+    entries = []
+    with open(sfv_path, 'r') as sfv_file:
+        for line in sfv_file:
+            if line.strip() and not line.startswith(';'):
+                file_name, expected_crc32 = line.rsplit(' ', 1)
+                entries.append((file_name, expected_crc32.strip().upper()))
+    return entries
+
+def verify_sfv(sfv_path, jobs=SFV_VERIFY_JOBS, stop_on_mismatch=False, result_callback=None, is_cancelled=None):
+    directory = os.path.dirname(sfv_path)
+    stopped = threading.Event()
+
+    def should_stop():
+        return stopped.is_set() or bool(is_cancelled and is_cancelled())
+
+    def check(file_name, expected_crc32):
+        file_path = os.path.join(directory, file_name)
+        if should_stop():
+            return SfvResult(file_name, expected_crc32, "", 0, "skipped")
+        if not os.path.exists(file_path):
+            return SfvResult(file_name, expected_crc32, "", 0, "missing")
+
+        try:
+            actual_crc32 = file_crc32(file_path, is_cancelled=should_stop).upper()
+        except HashCancelled:
+            return SfvResult(file_name, expected_crc32, "", 0, "skipped")
+        status = "ok" if actual_crc32 == expected_crc32 else "mismatch"
+        return SfvResult(file_name, expected_crc32, actual_crc32, os.path.getsize(file_path), status)
+
+    start_time = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [executor.submit(check, file_name, expected_crc32) for file_name, expected_crc32 in parse_sfv(sfv_path)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result.failed and stop_on_mismatch:
+                stopped.set()
+            if result_callback:
+                result_callback(result)
+
+    return results, time.perf_counter() - start_time
+
+def sfv_summary(results, elapsed):
+    checked = [result for result in results if result.status in ("ok", "mismatch")]
+    total_size = sum(result.size for result in checked)
+    skipped = sum(1 for result in results if result.status == "skipped")
+    rate = total_size / elapsed / 1048576 if elapsed > 0 else 0
+
+    summary = f"Checked {len(checked)} of {len(results)} files ({total_size / 1048576:.0f} MB) in {elapsed:.1f} seconds at {rate:.0f} MB/s"
+    if skipped:
+        summary += f", stopped early and skipped {skipped}"
+    return summary
+
+def sfv_result_lines(result):
+    if result.status == "missing":
+        return [f"File {result.file_name} not found."]
+    if result.status == "skipped":
+        return [f"{result.file_name}: skipped"]
+
+    lines = [f"Checking {result.file_name}: Expected [{result.expected_crc32}] vs Actual [{result.actual_crc32}]"]
+    lines.append(f"CRC mismatch for {result.file_name}" if result.status == "mismatch" else f"{result.file_name}: CRC matches")
+    return lines
+
+class SceneIndex:
+    def __init__(self, path):
+        self.path = path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self.connect()) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS releases ("
+                "dirname TEXT PRIMARY KEY, archivename TEXT, archive_mtime_ns INTEGER, sfvname TEXT, date TEXT, "
+                "nfoname TEXT, nfosize TEXT, nfo_mtime_ns INTEGER, nfocrc TEXT)"
+            )
+            db.commit()
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def read_release(self, db, directory, entries):
+        archive = nfo = None
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if entry.name.endswith(".rar") and archive is None and entry.is_file():
+                archive = entry
+            elif entry.name.endswith(".nfo") and nfo is None and entry.is_file():
+                nfo = entry
+        if archive is None and nfo is None:
+            return None, "missing"
+
+        archive_stat = archive.stat() if archive else None
+        nfo_stat = nfo.stat() if nfo else None
+        release = {
+            "dirname": directory,
+            "archivename": archive.name if archive else None,
+            "archive_mtime_ns": archive_stat.st_mtime_ns if archive else None,
+            "sfvname": archive.name.replace(".rar", ".sfv") if archive else None,
+            "date": time.strftime('%Y-%m-%d', time.gmtime(archive_stat.st_mtime)) if archive else None,
+            "nfoname": nfo.name if nfo else None,
+            "nfosize": str(nfo_stat.st_size) if nfo else None,
+            "nfo_mtime_ns": nfo_stat.st_mtime_ns if nfo else None,
+            "nfocrc": None
+        }
+
+        row = db.execute("SELECT * FROM releases WHERE dirname = ?", (directory,)).fetchone()
+        signature = ("archivename", "archive_mtime_ns", "nfoname", "nfosize", "nfo_mtime_ns")
+        if row is not None and all(row[key] == release[key] for key in signature):
+            return dict(row), "unchanged"
+
+        release["nfocrc"] = file_crc32(nfo.path) if nfo else None
+        db.execute(
+            "INSERT OR REPLACE INTO releases VALUES (:dirname, :archivename, :archive_mtime_ns, :sfvname, :date, :nfoname, :nfosize, :nfo_mtime_ns, :nfocrc)",
+            release
+        )
+        return release, "added" if row is None else "updated"
+
+    def refresh(self, directory):
+        directory = os.path.abspath(directory)
+        with closing(self.connect()) as db, os.scandir(directory) as entries:
+            release, status = self.read_release(db, directory, list(entries))
+            if status == "missing":
+                db.execute("DELETE FROM releases WHERE dirname = ?", (directory,))
+            db.commit()
+        return release
+
+    def scan(self, root, progress_callback=None):
+        root = os.path.abspath(root)
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        pending = [root]
+
+        with closing(self.connect()) as db:
+            while pending:
+                directory = pending.pop()
+                try:
+                    with os.scandir(directory) as iterator:
+                        entries = list(iterator)
+                except OSError:
+                    continue
+
+                pending.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+                release, status = self.read_release(db, directory, entries)
+                if release is not None:
+                    seen.add(directory)
+                    counts[status] += 1
+                    if progress_callback:
+                        progress_callback(directory, status)
+
+            prefix = root.rstrip(os.sep) + os.sep
+            for row in db.execute("SELECT dirname FROM releases WHERE dirname = ? OR substr(dirname, 1, ?) = ?", (root, len(prefix), prefix)).fetchall():
+                if row["dirname"] not in seen:
+                    db.execute("DELETE FROM releases WHERE dirname = ?", (row["dirname"],))
+                    counts["removed"] += 1
+            db.commit()
+
+        return counts
+
+    def lookup(self, directory):
+        with closing(self.connect()) as db:
+            row = db.execute("SELECT * FROM releases WHERE dirname = ?", (os.path.abspath(directory),)).fetchone()
+        return dict(row) if row else None
+
+    def releases(self):
+        with closing(self.connect()) as db:
+            return [dict(row) for row in db.execute("SELECT * FROM releases ORDER BY dirname")]
+
+def open_scene_index():
+    return SceneIndex(os.path.join(settings_directory(), "scene_index.sqlite3"))
+
+class RarIntegrityError(Exception):
+    pass
+
+def check_rar_member(info, results):
+    if int(results["File Size"]) != info.file_size:
+        raise RarIntegrityError(f"{info.filename} is corrupt: the RAR stores a size of {info.file_size} bytes but {results['File Size']} bytes were unpacked")
+
+    stored_crc32 = getattr(info, 'CRC', None)
+    if stored_crc32 is None:
+        return False
+    expected_crc32 = format(stored_crc32 & 0xFFFFFFFF, '08x')
+    if results["CRC32"] != expected_crc32:
+        raise RarIntegrityError(f"{info.filename} is corrupt: the RAR stores CRC32 {expected_crc32} but the unpacked data has {results['CRC32']}")
+    return True
+
+def rar_xci_member(rar):
+    members = [info for info in rar.infolist() if info.filename.lower().endswith('.xci')]
+    return max(members, key=lambda info: info.file_size) if members else None
+
+def rar_extract_path(rar_path, password, extract_dir):
+    import rarfile
+
+    with rarfile.RarFile(rar_path) as rar:
+        if password:
+            rar.setpassword(password)
+        info = rar_xci_member(rar)
+    return os.path.join(extract_dir, os.path.basename(info.filename)) if info else None
+
+def hash_rar_member(rar_path, password=None, extract_dir=None, progress_callback=None, is_cancelled=None, block_size=READ_BLOCK_SIZE, quiet=False):
+    import rarfile
+
+    with rarfile.RarFile(rar_path) as rar:
+        if password:
+            rar.setpassword(password)
+        info = rar_xci_member(rar)
+        if info is None:
+            raise InvalidXCIError(f"No XCI found in: {rar_path}")
+
+        hasher = MultiHasher()
+        reporter = ProgressReporter("Hashing XCI from RAR...", info.file_size, progress_callback, quiet=quiet)
+        extract_path = os.path.join(extract_dir, os.path.basename(info.filename)) if extract_dir else None
+        if extract_path and os.path.exists(extract_path):
+            raise FileExistsError(f"{extract_path} already exists, not overwriting it")
+        part_path = extract_path + '.part' if extract_path else None
+        part_created = False
+        sinks = []
+
+        try:
+            with open(part_path or os.devnull, 'wb') as extract_file:
+                if part_path:
+                    part_created = True
+                    sinks.append(FileSink(extract_file))
+
+                with rar.open(info) as stream, ParallelHashPipeline([hasher], buffer_size=block_size, sinks=sinks) as pipeline:
+                    reader = ChunkedReader(stream, block_size)
+                    while True:
+                        if is_cancelled and is_cancelled():
+                            raise HashCancelled()
+
+                        chunk_size = pipeline.update_from(reader)
+                        if not chunk_size:
+                            break
+                        reporter.advance(chunk_size)
+
+                for sink in sinks:
+                    sink.close()
+
+            results = hasher.results()
+            crc_verified = check_rar_member(info, results)
+            if part_path:
+                if os.path.exists(extract_path):
+                    raise FileExistsError(f"{extract_path} appeared while extracting, not overwriting it")
+                os.replace(part_path, extract_path)
+        except BaseException:
+            if part_created and os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    if not quiet:
+        print(f"\nCompleted hash calculation for {info.filename} in: {rar_path}")
+        print("Unpacked data matches the CRC32 stored in the RAR" if crc_verified else "The RAR stores no CRC32 for this file, only the size was checked")
+        if extract_path:
+            print(f"Extracted to: {extract_path}")
+
+    return results, pipeline.timings()
+
+def tee_to_file(reader, output_file, hashers, reporter=None):
+    sink = FileSink(output_file)
+    with ParallelHashPipeline(hashers, sinks=[sink]) as pipeline:
+        while chunk_size := pipeline.update_from(reader):
+            if reporter:
+                reporter.advance(chunk_size)
+    sink.close()
+
+def copy_and_hash(src_file, dst_file, src_offset, dst_offset, length, hashers, reporter, cache_mode="drop"):
+    processed_size = reporter.processed_size
+    try:
+        strategy = copy_range(src_file, dst_file, src_offset, dst_offset, length, reporter, COPY_STRATEGIES[:-1])
+    except OSError as e:
+        if e.errno != errno.ENOTSUP:
+            raise
+        reporter.processed_size = processed_size
+        src_file.seek(src_offset)
+        dst_file.seek(dst_offset)
+        tee_to_file(ChunkedReader(src_file, drop_behind=cache_mode != "keep"), dst_file, hashers, reporter)
+        return "chunked"
+
+    reporter.total_size += length
+    reporter.label = "Hashing written XCI..."
+    with open_input(dst_file.name, cache_mode) as written_file:
+        written_file.seek(dst_offset)
+        reader = ChunkedReader(written_file, length=length, drop_behind=cache_mode != "keep")
+        with ParallelHashPipeline(hashers) as pipeline:
+            while chunk_size := pipeline.update_from(reader):
+                reporter.advance(chunk_size)
+    return strategy
+
+def generate_full_xci_file(initial_area_path, default_xci_path, full_xci_path, hash_outputs=False, progress_callback=None, cache_mode="drop"):
+    with open(initial_area_path, 'rb') as initial_area_file:
+        initial_area = initial_area_file.read()
+    header = initial_area + b'\x00' * FULL_XCI_PADDING_SIZE
+
+    default_xci_size = os.path.getsize(default_xci_path)
+    reporter = ProgressReporter("Writing Initial Area...", len(header) + default_xci_size, progress_callback)
+    results = None
+
+    with open(full_xci_path, 'wb') as full_xci:
+        full_xci.write(header)
+        reporter.advance(len(initial_area))
+        reporter.advance(FULL_XCI_PADDING_SIZE, "Writing zeroes...")
+
+        reporter.label = "Writing XCI..."
+        with open_input(default_xci_path, cache_mode if hash_outputs else "keep") as default_xci:
+            if hash_outputs:
+                initial_area_hasher = MultiHasher()
+                initial_area_hasher.update(initial_area)
+                full_xci_hasher = MultiHasher()
+                full_xci_hasher.update(header)
+                default_hasher = MultiHasher()
+
+                strategy = copy_and_hash(default_xci, full_xci, 0, FULL_XCI_DATA_OFFSET, default_xci_size, [default_hasher, full_xci_hasher], reporter, cache_mode)
+                results = {1: default_hasher.results(), 2: initial_area_hasher.results(), 3: full_xci_hasher.results()}
+            else:
+                strategy = copy_range(default_xci, full_xci, 0, FULL_XCI_DATA_OFFSET, default_xci_size, reporter)
+                if cache_mode != "keep":
+                    advise_file(default_xci.fileno(), 0, 0, "POSIX_FADV_DONTNEED")
+
+        if cache_mode != "keep":
+            drop_file_cache(full_xci)
+
+    print(f"\nFullXCI file generated using {strategy}: {full_xci_path}")
+    return results
+
+def truncate_full_xci_file(full_xci_path, initial_area_path, default_xci_path, hash_outputs=False, progress_callback=None, cache_mode="drop"):
+    print(f"Starting FullXCI truncation for: {full_xci_path}")
+    reporter = ProgressReporter("Read Initial Area...", os.path.getsize(full_xci_path), progress_callback)
+    results = None
+
+    with open(full_xci_path, 'rb') as header_file:
+        header = header_file.read(FULL_XCI_DATA_OFFSET)
+    initial_area = header[:INITIAL_AREA_SIZE]
+    reporter.advance(INITIAL_AREA_SIZE)
+    reporter.advance(FULL_XCI_PADDING_SIZE, "Skipped zero padding...")
+
+    with open(initial_area_path, 'wb') as initial_area_file:
+        initial_area_file.write(initial_area)
+        print(f"\nInitial Area written to: {initial_area_path}")
+
+    with open_input(full_xci_path, cache_mode if hash_outputs else "keep") as file:
+        file.seek(FULL_XCI_DATA_OFFSET)
+
+        reporter.label = "Writing XCI..."
+        with open(default_xci_path, 'wb') as default_xci_file:
+            if hash_outputs:
+                initial_area_hasher = MultiHasher()
+                initial_area_hasher.update(initial_area)
+                full_xci_hasher = MultiHasher()
+                full_xci_hasher.update(header)
+                default_hasher = MultiHasher()
+
+                strategy = copy_and_hash(file, default_xci_file, FULL_XCI_DATA_OFFSET, 0, reporter.total_size - FULL_XCI_DATA_OFFSET, [default_hasher, full_xci_hasher], reporter, cache_mode)
+                results = {1: default_hasher.results(), 2: initial_area_hasher.results(), 3: full_xci_hasher.results()}
+            else:
+                strategy = copy_range(file, default_xci_file, FULL_XCI_DATA_OFFSET, 0, reporter.total_size - FULL_XCI_DATA_OFFSET, reporter)
+                if cache_mode != "keep":
+                    advise_file(file.fileno(), 0, 0, "POSIX_FADV_DONTNEED")
+
+            if cache_mode != "keep":
+                drop_file_cache(default_xci_file)
+
+    print(f"\nDefault XCI written using {strategy} to: {default_xci_path}")
+    return results
+
+XCI_HEADER_OFFSET = 0x100
+XCI_HEADER_SIZE = 0x100
+XCI_MEDIA_UNIT_SIZE = 0x200
+XCI_ECC_DATA_SIZE = 0x24
+XCI_ROM_CAPACITIES = {
+    0xFA: 0x40000000,
+    0xF8: 0x80000000,
+    0xF0: 0x100000000,
+    0xE0: 0x200000000,
+    0xE1: 0x400000000,
+    0xE2: 0x800000000,
+    0xE3: 0x1000000000
+}
+
+class InvalidXCIError(ValueError):
+    pass
+
+@dataclass
+class XCIHeader:
+    __slots__ = (
+        "magic", "packing_type", "data_offset", "file_size", "rom_size", "rom_capacity", "cart_size",
+        "hfs0_offset", "hfs0_size", "hfs0_header_hash", "initial_data_hash"
+    )
+    magic: bytes
+    packing_type: str
+    data_offset: int
+    file_size: int
+    rom_size: int
+    rom_capacity: int
+    cart_size: int
+    hfs0_offset: int
+    hfs0_size: int
+    hfs0_header_hash: bytes
+    initial_data_hash: bytes
+
+    @property
+    def is_full_xci(self):
+        return self.packing_type == "FullXCI"
+
+    @property
+    def padding_size(self):
+        return max(0, self.cart_size - (self.file_size - self.data_offset))
+
+    @property
+    def is_trimmed(self):
+        return self.padding_size > 0
+
+def parse_xci_header(data, file_size):
+    for packing_type, data_offset in (("Default", 0), ("FullXCI", FULL_XCI_DATA_OFFSET)):
+        header = data[data_offset + XCI_HEADER_OFFSET:data_offset + XCI_HEADER_OFFSET + XCI_HEADER_SIZE]
+        if len(header) == XCI_HEADER_SIZE and header[:4] == b"HEAD":
+            break
+    else:
+        raise InvalidXCIError("No XCI header found")
+
+    magic, rom_size = struct.unpack_from('<4s9xB', header)
+    hfs0_offset, hfs0_size, hfs0_header_hash, initial_data_hash = struct.unpack_from('<QQ32s32s', header, 0x30)
+
+    rom_capacity = XCI_ROM_CAPACITIES.get(rom_size, 0)
+    cart_size = rom_capacity - (rom_capacity // XCI_MEDIA_UNIT_SIZE) * XCI_ECC_DATA_SIZE
+
+    return XCIHeader(
+        magic, packing_type, data_offset, file_size, rom_size, rom_capacity, cart_size,
+        hfs0_offset, hfs0_size, hfs0_header_hash, initial_data_hash
+    )
+
+xci_header_cache = {}
+xci_header_cache_lock = threading.Lock()
+
+def read_xci_header(file_path):
+    stat = os.stat(file_path)
+    key = (os.path.realpath(file_path), stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    with xci_header_cache_lock:
+        header = xci_header_cache.get(key)
+    if header is not None:
+        return header
+
+    with open(file_path, 'rb') as file:
+        data = file.read(FULL_XCI_DATA_OFFSET + XCI_HEADER_OFFSET + XCI_HEADER_SIZE)
+    header = parse_xci_header(data, stat.st_size)
+
+    with xci_header_cache_lock:
+        xci_header_cache[key] = header
+    return header
+
+def is_full_xci(file_path):
+    return read_xci_header(file_path).is_full_xci
+
+def untrim_xci_file(xci_path, output_path, progress_callback=None):
+    header = read_xci_header(xci_path)
+    reporter = ProgressReporter("Copying XCI...", header.file_size + header.padding_size, progress_callback)
+
+    with open(xci_path, 'rb', buffering=0) as xci_file, open(output_path, 'wb') as output_file:
+        strategy = copy_range(xci_file, output_file, 0, 0, header.file_size, reporter)
+
+        output_file.seek(header.file_size)
+        reporter.label = "Writing padding..."
+        for chunk in PaddingReader(header.padding_size):
+            output_file.write(chunk)
+            reporter.advance(len(chunk))
+
+    print(f"\nUntrimmed XCI written using {strategy} to: {output_path}")
+    return strategy
+
+HFS0_HEADER_SIZE = 0x10
+HFS0_ENTRY_SIZE = 0x40
+HFS0_MAX_TABLE_SIZE = 0x100000
+HFS0_PARTITIONS = ("update", "normal", "secure", "logo")
+VERIFY_JOBS = 8
+
+@dataclass
+class HFS0Entry:
+    __slots__ = ("partition", "name", "offset", "size", "hashed_size", "hash")
+    partition: str
+    name: str
+    offset: int
+    size: int
+    hashed_size: int
+    hash: bytes
+
+@dataclass
+class IntegrityFailure:
+    __slots__ = ("partition", "name", "reason")
+    partition: str
+    name: str
+    reason: str
+
+    def __str__(self):
+        return f"{self.partition}/{self.name}: {self.reason}" if self.name else f"{self.partition}: {self.reason}"
+
+def read_at(file, size, offset):
+    if not hasattr(os, 'pread'):
+        with open(file.name, 'rb') as positioned_file:
+            positioned_file.seek(offset)
+            return positioned_file.read(size)
+
+    chunks = []
+    while size > 0:
+        chunk = os.pread(file.fileno(), size, offset)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+        offset += len(chunk)
+    return b"".join(chunks)
+
+def read_hfs0(file, offset, partition):
+    header = read_at(file, HFS0_HEADER_SIZE, offset)
+    if len(header) < HFS0_HEADER_SIZE or header[:4] != b"HFS0":
+        raise InvalidXCIError(f"No HFS0 header found for the {partition} partition at offset {offset:#x}")
+
+    file_count, string_table_size = struct.unpack_from('<II', header, 4)
+    entry_table_size = file_count * HFS0_ENTRY_SIZE
+    if entry_table_size + string_table_size > HFS0_MAX_TABLE_SIZE:
+        raise InvalidXCIError(f"The {partition} partition header claims {file_count} files and a {string_table_size:#x} byte string table")
+    tables = read_at(file, entry_table_size + string_table_size, offset + HFS0_HEADER_SIZE)
+    if len(tables) < entry_table_size + string_table_size:
+        raise InvalidXCIError(f"The {partition} partition header is truncated")
+
+    header_size = HFS0_HEADER_SIZE + entry_table_size + string_table_size
+    entries = []
+    for index in range(file_count):
+        entry_offset, size, name_offset, hashed_size, entry_hash = struct.unpack_from('<QQII8x32s', tables, index * HFS0_ENTRY_SIZE)
+        name_start = entry_table_size + name_offset
+        name_end = tables.find(b"\0", name_start)
+        if name_offset >= string_table_size or name_end < 0:
+            raise InvalidXCIError(f"A file name in the {partition} partition is outside its string table")
+        name = tables[name_start:name_end].decode('utf-8', 'replace')
+        entries.append(HFS0Entry(partition, name, offset + header_size + entry_offset, size, hashed_size, entry_hash))
+
+    return header_size, entries
+
+def check_hfs0_entry(file, entry):
+    data = read_at(file, entry.hashed_size, entry.offset)
+    if len(data) < entry.hashed_size:
+        return IntegrityFailure(entry.partition, entry.name, f"hashed region ends past the end of the file ({entry.offset + entry.hashed_size:#x})")
+    if hashlib.sha256(data).digest() != entry.hash:
+        return IntegrityFailure(entry.partition, entry.name, f"SHA256 mismatch in the first {entry.hashed_size:#x} bytes at offset {entry.offset:#x}")
+    return None
+
+def verify_xci_integrity(file_path, jobs=VERIFY_JOBS):
+    header = read_xci_header(file_path)
+    failures = []
+
+    with open(file_path, 'rb', buffering=0) as file:
+        root_offset = header.data_offset + header.hfs0_offset
+        root_header_size, root_entries = read_hfs0(file, root_offset, "root")
+
+        if hashlib.sha256(read_at(file, header.hfs0_size, root_offset)).digest() != header.hfs0_header_hash:
+            failures.append(IntegrityFailure("root", "", "HFS0 header hash does not match the XCI header"))
+
+        entries = []
+        for partition in root_entries:
+            entries.append(HFS0Entry("root", partition.name, partition.offset, partition.size, partition.hashed_size, partition.hash))
+            if partition.name not in HFS0_PARTITIONS:
+                failures.append(IntegrityFailure("root", partition.name, "unknown partition"))
+                continue
+            try:
+                entries.extend(read_hfs0(file, partition.offset, partition.name)[1])
+            except InvalidXCIError as e:
+                failures.append(IntegrityFailure(partition.name, "", str(e)))
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            failures.extend(failure for failure in executor.map(lambda entry: check_hfs0_entry(file, entry), entries) if failure)
+
+    return entries, failures
+
+def settings_directory():
+    if platform.system() == "Windows":
+        return os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "MyCompany")
+    return os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")), "MyCompany")
+
+def mediastamp_from_serial(media_serial2):
+    return media_serial2[-3:] if len(media_serial2) >= 3 else ""
+
+def game_id2_from_serial(media_serial1):
+    if media_serial1.endswith('1'):
+        return media_serial1[:-5] if len(media_serial1) > 5 else media_serial1
+    return media_serial1[:-4] if len(media_serial1) > 4 else media_serial1
+
+def card_id_comment(file_path):
+    with open(file_path, 'rb') as file:
+        card_id = file.read()
+    card_id_hex = card_id.hex().upper()
+    card_id1 = card_id_hex[:8]
+    card_id2 = card_id_hex[8:16]
+    card_id3 = card_id_hex[16:24]
+    crc32 = format(zlib.crc32(card_id) & 0xFFFFFFFF, '08x').upper()
+    return f"Card ID 1: {card_id1}\nCard ID 2: {card_id2}\nCard ID 3: {card_id3}\nCRC32: {crc32}"
+
+def find_hactoolnet():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    if platform.system() == "Windows":
+        hactoolnet_path = os.path.join(script_dir, "hactoolnet.exe")
+    else:
+        hactoolnet_path = os.path.join(script_dir, "hactoolnet")
+
+    return hactoolnet_path, os.path.join(script_dir, "prod.keys")
+
+def run_hactoolnet(hactoolnet_path, prod_keys_path, xci_file):
+    command = [hactoolnet_path, "-k", prod_keys_path, "-t", "xci", "--disablekeywarns", "--listtitles", xci_file]
+    result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
+    return result.stdout
+
+def parse_hactoolnet_output(output):
+    hactool_title_regex = re.compile(r'^(?P<title_id>[a-f0-9]{16})\s+(?P<version>v\d+)\s+(?:\d+\.){3}\d+\s+(?P<type>Application|Patch)\s+\d+(?:\.\d+)?\s+[a-z]{2}\s+(?P<display_version>[^\s]+)\s+(?P<name>.+?)\s+(?P<languages>[\w-]+(?:,[\w-]+)*)$', flags=(re.MULTILINE | re.IGNORECASE))
+
+    return collect_titles({
+        'title_id': match.group('title_id'),
+        'version': match.group('version'),
+        'type': match.group('type'),
+        'display_version': match.group('display_version'),
+        'name': match.group('name'),
+        'languages': match.group('languages').split(',')
+    } for match in re.finditer(hactool_title_regex, output))
+
+TITLE_LANGUAGES = {
+    "en-US": "En", "en-GB": "En", "ja": "Ja", "fr": "Fr", "de": "De",
+    "es-419": "Es", "es": "Es", "it": "It", "nl": "Nl", "fr-CA": "Fr",
+    "pt": "Pt", "ru": "Ru", "ko": "Ko", "zh-TW": "Zh-Hant", "zh-CN": "Zh-Hans"
+}
+TITLE_LANGUAGE_ALIASES = {"en": "en-US", "zh": "zh-CN", "pt-br": "pt"}
+
+def collect_titles(title_entries):
+    language_set = set()
+    language_dict = TITLE_LANGUAGES
+
+    base_titles, update_titles = {}, {}
+
+    base_title_ids, update_title_ids, updates, versions, titles = [], [], [], [], []
+
+    for title_entry in title_entries:
+        title_id = title_entry['title_id']
+        title_version = title_entry['version']
+        title_type = title_entry['type']
+        display_version = title_entry['display_version']
+        title_name = title_entry['name']
+        title_languages = title_entry['languages']
+
+        detected_languages = [lang for lang in language_dict if lang in title_languages]
+        for lang in detected_languages:
+            language_set.add(language_dict[lang])
+
+        entry = {
+            'version': title_version,
+            'display_version': display_version,
+            'name': title_name,
+        }
+
+        if title_type == 'Application':
+            base_titles.update({ title_id.upper(): entry })
+        else:
+            update_titles.update({ title_id.upper(): entry })
+
+    for title_id, base_entry in base_titles.items():
+        base_title_ids.append(title_id)
+
+        update_tid_int = int(title_id, 16) | 0x800
+        update_tid = f'{update_tid_int:016X}'
+
+        update_entry = update_titles.get(update_tid, {})
+        if update_entry:
+            update_title_ids.append(update_tid)
+            updates.append(update_entry['version'])
+            if update_entry['display_version']:
+                versions.append("v" + update_entry['display_version'])
+            titles.append(update_entry['name'])
+        else:
+            updates.append(base_entry['version'])
+            if base_entry['display_version']:
+                versions.append("v" + base_entry['display_version'])
+            titles.append(base_entry['name'])
+
+    return base_title_ids, update_title_ids, updates, versions, titles, sorted(language_set)
+
+NCA_HEADER_SIZE = 0xC00
+NCA_MEDIA_UNIT_SIZE = 0x200
+NCA_CONTENT_TYPES = {1: "Meta", 2: "Control"}
+NCA_KEY_AREA_NAMES = ("application", "ocean", "system")
+CNMT_TITLE_TYPES = {0x80: "Application", 0x81: "Patch"}
+NACP_SIZE = 0x4000
+NACP_LANGUAGES = ("en-US", "en-GB", "ja", "fr", "de", "es-419", "es", "it", "nl", "fr-CA", "pt", "ru", "ko", "zh-TW", "zh-CN", "pt-BR")
+
+class NCAError(ValueError):
+    pass
+
+def aes_multiply(a, b):
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a = ((a << 1) ^ 0x11B) if a & 0x80 else a << 1
+        b >>= 1
+    return result
+
+def aes_tables():
+    exp, log = [0] * 255, [0] * 256
+    value = 1
+    for index in range(255):
+        exp[index], log[value] = value, index
+        value ^= aes_multiply(value, 2)
+
+    sbox = [0] * 256
+    inverse = [0] + [exp[(255 - log[value]) % 255] for value in range(1, 256)]
+    for value in range(256):
+        b = inverse[value] if value else 0
+        sbox[value] = b ^ ((b << 1 | b >> 7) & 0xFF) ^ ((b << 2 | b >> 6) & 0xFF) ^ ((b << 3 | b >> 5) & 0xFF) ^ ((b << 4 | b >> 4) & 0xFF) ^ 0x63
+    inv_sbox = [0] * 256
+    for value, substituted in enumerate(sbox):
+        inv_sbox[substituted] = value
+
+    def rotations(table):
+        return [table] + [[(word >> (8 * shift)) | ((word << (32 - 8 * shift)) & 0xFFFFFFFF) for word in table] for shift in (1, 2, 3)]
+
+    encrypt = rotations([aes_multiply(s, 2) << 24 | s << 16 | s << 8 | aes_multiply(s, 3) for s in sbox])
+    decrypt = rotations([aes_multiply(s, 14) << 24 | aes_multiply(s, 9) << 16 | aes_multiply(s, 13) << 8 | aes_multiply(s, 11) for s in inv_sbox])
+    return sbox, inv_sbox, encrypt, decrypt
+
+aes_tables_cache = []
+
+class AES128:
+    def __init__(self, key):
+        if not aes_tables_cache:
+            aes_tables_cache.append(aes_tables())
+        self.sbox, self.inv_sbox, self.te, self.td = aes_tables_cache[0]
+        sbox = self.sbox
+
+        words = list(struct.unpack('>4I', key))
+        rcon = 1
+        for index in range(4, 44):
+            word = words[index - 1]
+            if index % 4 == 0:
+                word = (sbox[word >> 16 & 0xFF] << 24 | sbox[word >> 8 & 0xFF] << 16 | sbox[word & 0xFF] << 8 | sbox[word >> 24]) ^ (rcon << 24)
+                rcon = aes_multiply(rcon, 2)
+            words.append(words[index - 4] ^ word)
+        self.encrypt_keys = words
+
+        td0, td1, td2, td3 = self.td
+        self.decrypt_keys = []
+        for round_index in range(10, -1, -1):
+            round_keys = words[round_index * 4:round_index * 4 + 4]
+            if 0 < round_index < 10:
+                round_keys = [td0[sbox[word >> 24]] ^ td1[sbox[word >> 16 & 0xFF]] ^ td2[sbox[word >> 8 & 0xFF]] ^ td3[sbox[word & 0xFF]] for word in round_keys]
+            self.decrypt_keys.extend(round_keys)
+
+    def encrypt_block(self, block):
+        te0, te1, te2, te3 = self.te
+        keys = self.encrypt_keys
+        s0, s1, s2, s3 = struct.unpack('>4I', block)
+        s0, s1, s2, s3 = s0 ^ keys[0], s1 ^ keys[1], s2 ^ keys[2], s3 ^ keys[3]
+        for index in range(4, 40, 4):
+            s0, s1, s2, s3 = (
+                te0[s0 >> 24] ^ te1[s1 >> 16 & 0xFF] ^ te2[s2 >> 8 & 0xFF] ^ te3[s3 & 0xFF] ^ keys[index],
+                te0[s1 >> 24] ^ te1[s2 >> 16 & 0xFF] ^ te2[s3 >> 8 & 0xFF] ^ te3[s0 & 0xFF] ^ keys[index + 1],
+                te0[s2 >> 24] ^ te1[s3 >> 16 & 0xFF] ^ te2[s0 >> 8 & 0xFF] ^ te3[s1 & 0xFF] ^ keys[index + 2],
+                te0[s3 >> 24] ^ te1[s0 >> 16 & 0xFF] ^ te2[s1 >> 8 & 0xFF] ^ te3[s2 & 0xFF] ^ keys[index + 3]
+            )
+        sbox = self.sbox
+        return struct.pack('>4I', *(
+            (sbox[a >> 24] << 24 | sbox[b >> 16 & 0xFF] << 16 | sbox[c >> 8 & 0xFF] << 8 | sbox[d & 0xFF]) ^ keys[40 + index]
+            for index, (a, b, c, d) in enumerate(((s0, s1, s2, s3), (s1, s2, s3, s0), (s2, s3, s0, s1), (s3, s0, s1, s2)))
+        ))
+
+    def decrypt_block(self, block):
+        td0, td1, td2, td3 = self.td
+        keys = self.decrypt_keys
+        s0, s1, s2, s3 = struct.unpack('>4I', block)
+        s0, s1, s2, s3 = s0 ^ keys[0], s1 ^ keys[1], s2 ^ keys[2], s3 ^ keys[3]
+        for index in range(4, 40, 4):
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24] ^ td1[s3 >> 16 & 0xFF] ^ td2[s2 >> 8 & 0xFF] ^ td3[s1 & 0xFF] ^ keys[index],
+                td0[s1 >> 24] ^ td1[s0 >> 16 & 0xFF] ^ td2[s3 >> 8 & 0xFF] ^ td3[s2 & 0xFF] ^ keys[index + 1],
+                td0[s2 >> 24] ^ td1[s1 >> 16 & 0xFF] ^ td2[s0 >> 8 & 0xFF] ^ td3[s3 & 0xFF] ^ keys[index + 2],
+                td0[s3 >> 24] ^ td1[s2 >> 16 & 0xFF] ^ td2[s1 >> 8 & 0xFF] ^ td3[s0 & 0xFF] ^ keys[index + 3]
+            )
+        inv_sbox = self.inv_sbox
+        return struct.pack('>4I', *(
+            (inv_sbox[a >> 24] << 24 | inv_sbox[b >> 16 & 0xFF] << 16 | inv_sbox[c >> 8 & 0xFF] << 8 | inv_sbox[d & 0xFF]) ^ keys[40 + index]
+            for index, (a, b, c, d) in enumerate(((s0, s3, s2, s1), (s1, s0, s3, s2), (s2, s1, s0, s3), (s3, s2, s1, s0)))
+        ))
+
+    def decrypt_ecb(self, data):
+        return b"".join(self.decrypt_block(data[index:index + 16]) for index in range(0, len(data), 16))
+
+    def crypt_ctr(self, data, counter):
+        keystream = b"".join(self.encrypt_block(((counter + index) & ((1 << 128) - 1)).to_bytes(16, 'big')) for index in range((len(data) + 15) // 16))
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream[:len(data)], 'big')).to_bytes(len(data), 'big')
+
+def xts_decrypt(data_cipher, tweak_cipher, data, sector, sector_size=NCA_MEDIA_UNIT_SIZE):
+    output = bytearray()
+    for sector_offset in range(0, len(data), sector_size):
+        tweak = int.from_bytes(tweak_cipher.encrypt_block(sector.to_bytes(16, 'big')), 'little')
+        for offset in range(sector_offset, sector_offset + sector_size, 16):
+            tweak_bytes = tweak.to_bytes(16, 'little')
+            block = bytes(a ^ b for a, b in zip(data[offset:offset + 16], tweak_bytes))
+            output += bytes(a ^ b for a, b in zip(data_cipher.decrypt_block(block), tweak_bytes))
+            tweak <<= 1
+            if tweak >> 128:
+                tweak = (tweak & ((1 << 128) - 1)) ^ 0x87
+        sector += 1
+    return bytes(output)
+
+def load_keyset(prod_keys_path):
+    keyset = {}
+    with open(prod_keys_path, encoding='utf-8') as prod_keys_file:
+        for line in prod_keys_file:
+            name, separator, value = line.partition('=')
+            if not separator:
+                continue
+            try:
+                keyset[name.strip().lower()] = bytes.fromhex(value.strip())
+            except ValueError:
+                continue
+    return keyset
+
+class NCASection:
+    def __init__(self, nca, index):
+        start, end = struct.unpack_from('<II', nca.header, 0x240 + index * 0x10)
+        if end <= start:
+            raise NCAError(f"NCA section {index} is empty")
+        if end * NCA_MEDIA_UNIT_SIZE > nca.size:
+            raise NCAError(f"NCA section {index} runs past the end of the NCA")
+
+        self.nca = nca
+        self.start = start * NCA_MEDIA_UNIT_SIZE
+        self.size = (end - start) * NCA_MEDIA_UNIT_SIZE
+        self.fs_header = nca.header[0x400 + index * 0x200:0x600 + index * 0x200]
+        self.fs_type, self.hash_type, self.encryption_type = self.fs_header[2], self.fs_header[3], self.fs_header[4]
+
+        if self.encryption_type == 3:
+            self.cipher = AES128(nca.key_area()[0x20:0x30])
+            self.counter = int.from_bytes(self.fs_header[0x140:0x148], 'little') << 64
+        elif self.encryption_type != 1:
+            raise NCAError(f"Unsupported NCA section encryption type {self.encryption_type}")
+
+    def read(self, offset, size):
+        if offset + size > self.size:
+            raise NCAError(f"Read of {size:#x} bytes at {offset:#x} runs past the end of the NCA section")
+
+        absolute = self.start + offset
+        if self.encryption_type == 1:
+            data = read_at(self.nca.file, size, self.nca.offset + absolute)
+        else:
+            aligned = absolute & ~0xF
+            data = read_at(self.nca.file, (absolute + size - aligned + 15) & ~0xF, self.nca.offset + aligned)
+            data = self.cipher.crypt_ctr(data, self.counter | (aligned >> 4))[absolute - aligned:absolute - aligned + size]
+        if len(data) != size:
+            raise NCAError("NCA section is truncated")
+        return data
+
+    def data_offset(self):
+        if self.fs_type == 1:
+            return struct.unpack_from('<Q', self.fs_header, 0x40)[0]
+        if self.fs_header[0x8:0xC] != b"IVFC":
+            raise NCAError("RomFS section has no IVFC header")
+        return struct.unpack_from('<Q', self.fs_header, 0x90)[0]
+
+class NCA:
+    def __init__(self, file, offset, size, keyset):
+        header_key = keyset.get("header_key")
+        if not header_key or len(header_key) != 32:
+            raise NCAError("header_key is missing from prod.keys")
+
+        self.file = file
+        self.offset = offset
+        self.size = size
+        self.keyset = keyset
+        self.header_ciphers = (AES128(header_key[:16]), AES128(header_key[16:]))
+
+        self.header = (b"\0" * NCA_MEDIA_UNIT_SIZE) + xts_decrypt(*self.header_ciphers, read_at(file, NCA_MEDIA_UNIT_SIZE, offset + NCA_MEDIA_UNIT_SIZE), 1)
+        if self.header[0x200:0x204] != b"NCA3":
+            raise NCAError(f"Unsupported NCA header magic {self.header[0x200:0x204]!r}")
+        self.content_type = self.header[0x205]
+        self.program_id = struct.unpack_from('<Q', self.header, 0x210)[0]
+
+    def load(self):
+        if len(self.header) < NCA_HEADER_SIZE:
+            self.header += xts_decrypt(
+                *self.header_ciphers, read_at(self.file, NCA_HEADER_SIZE - len(self.header), self.offset + len(self.header)), len(self.header) // NCA_MEDIA_UNIT_SIZE
+            )
+        return self
+
+    def key_area(self):
+        if any(self.header[0x230:0x240]):
+            raise NCAError("NCA uses titlekey crypto, which isn't expected on a cart")
+
+        generation = max(self.header[0x206], self.header[0x220])
+        key_index = self.header[0x207]
+        if key_index >= len(NCA_KEY_AREA_NAMES):
+            raise NCAError(f"Unknown key area encryption key index {key_index}")
+        key_name = f"key_area_key_{NCA_KEY_AREA_NAMES[key_index]}_{max(generation - 1, 0):02x}"
+        key = self.keyset.get(key_name)
+        if not key or len(key) != 16:
+            raise NCAError(f"{key_name} is missing from prod.keys")
+        return AES128(key).decrypt_ecb(self.header[0x300:0x340])
+
+    def section(self, index):
+        return NCASection(self, index)
+
+def read_pfs0_file(section, suffix):
+    data_offset = section.data_offset()
+    header = section.read(data_offset, 0x10)
+    if header[:4] != b"PFS0":
+        raise NCAError("No PFS0 header found in the Meta NCA")
+
+    file_count, string_table_size = struct.unpack_from('<II', header, 4)
+    tables = section.read(data_offset + 0x10, file_count * 0x18 + string_table_size)
+    files_offset = data_offset + 0x10 + len(tables)
+    for index in range(file_count):
+        file_offset, size, name_offset = struct.unpack_from('<QQI', tables, index * 0x18)
+        name_start = file_count * 0x18 + name_offset
+        name_end = tables.find(b"\0", name_start)
+        if name_offset >= string_table_size or name_end < 0:
+            raise NCAError("PFS0 file name is outside the string table")
+        name = tables[name_start:name_end].decode('utf-8', 'replace')
+        if name.endswith(suffix):
+            return section.read(files_offset + file_offset, size)
+    raise NCAError(f"No {suffix} file found in the PFS0")
+
+def read_romfs_file(section, file_name):
+    data_offset = section.data_offset()
+    header = struct.unpack('<10Q', section.read(data_offset, 0x50))
+    file_table_offset, file_table_size, file_data_offset = header[7], header[8], header[9]
+
+    table = section.read(data_offset + file_table_offset, file_table_size)
+    position = 0
+    while position + 0x20 <= len(table):
+        file_offset, size, _, name_size = struct.unpack_from('<QQII', table, position + 0x8)
+        if position + 0x20 + name_size > len(table):
+            raise NCAError("RomFS file name is outside the file table")
+        name = table[position + 0x20:position + 0x20 + name_size].decode('utf-8', 'replace')
+        if name == file_name:
+            return section.read(data_offset + file_data_offset + file_offset, size)
+        position += 0x20 + ((name_size + 3) & ~3)
+    raise NCAError(f"No {file_name} found in the RomFS")
+
+def parse_nacp(nacp):
+    if len(nacp) != NACP_SIZE:
+        raise NCAError(f"control.nacp is {len(nacp):#x} bytes instead of {NACP_SIZE:#x}")
+
+    names = [nacp[index * 0x300:index * 0x300 + 0x200].split(b"\0", 1)[0].decode('utf-8', 'replace') for index in range(len(NACP_LANGUAGES))]
+    supported = struct.unpack_from('<I', nacp, 0x302C)[0]
+    languages = [language for index, language in enumerate(NACP_LANGUAGES) if supported & (1 << index)] or [language for language, name in zip(NACP_LANGUAGES, names) if name]
+
+    return {
+        'name': next((name for name in names if name), ""),
+        'display_version': nacp[0x3060:0x3070].split(b"\0", 1)[0].decode('utf-8', 'replace'),
+        'languages': languages
+    }
+
+def read_xci_titles(xci_path, prod_keys_path):
+    keyset = load_keyset(prod_keys_path)
+    header = read_xci_header(xci_path)
+
+    with open(xci_path, 'rb', buffering=0) as file:
+        _, partitions = read_hfs0(file, header.data_offset + header.hfs0_offset, "root")
+        secure = next((partition for partition in partitions if partition.name == "secure"), None)
+        if secure is None:
+            raise NCAError("No secure partition found")
+
+        metas, controls = [], {}
+        for entry in read_hfs0(file, secure.offset, "secure")[1]:
+            if not entry.name.endswith('.nca'):
+                continue
+            nca = NCA(file, entry.offset, entry.size, keyset)
+            if NCA_CONTENT_TYPES.get(nca.content_type) == "Meta":
+                title_id, version, title_type = struct.unpack_from('<QIB', read_pfs0_file(nca.load().section(0), '.cnmt'))
+                if title_type in CNMT_TITLE_TYPES:
+                    metas.append((title_id, version, CNMT_TITLE_TYPES[title_type]))
+            elif NCA_CONTENT_TYPES.get(nca.content_type) == "Control":
+                controls[nca.program_id] = parse_nacp(read_romfs_file(nca.load().section(0), "control.nacp"))
+
+    title_entries = []
+    for title_id, version, title_type in metas:
+        control = controls.get(title_id)
+        if control is None:
+            raise NCAError(f"No Control NCA found for {title_id:016X}")
+        title_entries.append(dict(control, title_id=f"{title_id:016X}", version=f"v{version}", type=title_type))
+    if not title_entries:
+        raise NCAError("No application or patch titles found")
+    return collect_titles(title_entries)
+
+class MetadataCache:
+    def __init__(self, path, max_entries=METADATA_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self.connect()) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS titles ("
+                "header TEXT, keyset TEXT, titles TEXT, last_used REAL, PRIMARY KEY (header, keyset))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS titles_last_used ON titles (last_used)")
+            db.commit()
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def identity(self, xci_path, prod_keys_path):
+        try:
+            header = read_xci_header(xci_path)
+        except (InvalidXCIError, OSError):
+            return None
+
+        with open(prod_keys_path, 'rb') as prod_keys_file:
+            keyset = hashlib.sha256(prod_keys_file.read()).hexdigest()
+        return (header.hfs0_header_hash + header.initial_data_hash).hex(), keyset
+
+    def get(self, xci_path, prod_keys_path):
+        key = self.identity(xci_path, prod_keys_path)
+        if key is None:
+            return None
+
+        with closing(self.connect()) as db:
+            row = db.execute("SELECT titles FROM titles WHERE header = ? AND keyset = ?", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute("UPDATE titles SET last_used = ? WHERE header = ? AND keyset = ?", (time.time(),) + key)
+            db.commit()
+
+        self.hits += 1
+        return tuple(json.loads(row[0]))
+
+    def put(self, xci_path, prod_keys_path, titles):
+        key = self.identity(xci_path, prod_keys_path)
+        if key is None:
+            return
+
+        with closing(self.connect()) as db:
+            db.execute("DELETE FROM titles WHERE header = ?", key[:1])
+            db.execute("INSERT INTO titles VALUES (?, ?, ?, ?)", key + (json.dumps(titles), time.time()))
+            db.execute("DELETE FROM titles WHERE rowid IN (SELECT rowid FROM titles ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            db.commit()
+
+    def clear(self):
+        with closing(self.connect()) as db:
+            db.execute("DELETE FROM titles")
+            db.commit()
+
+def open_metadata_cache():
+    return MetadataCache(os.path.join(settings_directory(), "metadata_cache.sqlite3"))
+
+def list_titles(xci_path, hactoolnet_path, prod_keys_path, cache=None):
+    if cache:
+        titles = cache.get(xci_path, prod_keys_path)
+        if titles is not None:
+            return titles
+
+    try:
+        titles = read_xci_titles(xci_path, prod_keys_path)
+    except (ValueError, struct.error) as e:
+        if not os.path.exists(hactoolnet_path):
+            raise NCAError(f"{e}, and hactoolnet isn't available to fall back to")
+        titles = parse_hactoolnet_output(run_hactoolnet(hactoolnet_path, prod_keys_path, xci_path))
+    if cache and titles[0]:
+        cache.put(xci_path, prod_keys_path, titles)
+    return titles
+
+TITLE_DATABASE_ALIASES = {
+    "title_id": ("title_id", "titleid", "id", "tid"),
+    "name": ("name", "title", "title_name"),
+    "languages": ("languages", "language"),
+    "version": ("version", "update"),
+    "display_version": ("display_version", "displayversion", "version_string")
+}
+TITLE_DATABASE_FIELDS = ("Game Name", "Languages")
+
+def normalize_language(code):
+    code = code.strip()
+    for known, formatted in TITLE_LANGUAGES.items():
+        if code.lower() in (known.lower(), formatted.lower()):
+            return known
+    return TITLE_LANGUAGE_ALIASES.get(code.lower())
+
+def title_database_rows(record):
+    record = {str(key).lower().replace(" ", "_"): value for key, value in record.items()}
+
+    if "base_title_ids" in record:
+        def values(key):
+            value = record.get(key) or []
+            return value if isinstance(value, list) else [item.strip() for item in str(value).split(",")]
+
+        for title_id, name, display_version, version in zip(values("base_title_ids"), values("titles"), values("versions"), values("updates")):
+            yield {"title_id": title_id, "name": name, "languages": values("languages"), "version": version, "display_version": display_version}
+        return
+
+    row = {}
+    for field, aliases in TITLE_DATABASE_ALIASES.items():
+        row[field] = next((record[alias] for alias in aliases if record.get(alias) not in (None, "")), None)
+    yield row
+
+class TitleDatabase:
+    def __init__(self, path):
+        self.path = path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self.connect()) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS titles ("
+                "title_id TEXT PRIMARY KEY, name TEXT, languages TEXT, version INTEGER, display_version TEXT)"
+            )
+            db.commit()
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def read_records(self, source_path):
+        with open(source_path, newline='', encoding='utf-8-sig') as source_file:
+            if not source_path.lower().endswith('.json'):
+                return list(csv.DictReader(source_file))
+            data = json.load(source_file)
+
+        if isinstance(data, dict):
+            data = [dict(value, id=value.get("id") or key) if isinstance(value, dict) else {"id": key, "name": value} for key, value in data.items()]
+        return [record for record in data if isinstance(record, dict)]
+
+    def load(self, source_path):
+        titles = []
+        for record in self.read_records(source_path):
+            for row in title_database_rows(record):
+                title_id = str(row["title_id"] or "").strip().upper()
+                if not re.fullmatch(r'[0-9A-F]{16}', title_id) or not row["name"]:
+                    continue
+
+                languages = row["languages"] or []
+                if isinstance(languages, str):
+                    languages = languages.split(",")
+                languages = [normalize_language(str(language)) for language in languages]
+
+                version = str(row["version"] or "0").strip().lstrip("vV")
+                titles.append((
+                    title_id, str(row["name"]).strip(), ",".join(language for language in languages if language),
+                    int(version) if version.isdigit() else 0, str(row["display_version"] or "").strip().lstrip("vV")
+                ))
+
+        with closing(self.connect()) as db:
+            db.executemany("INSERT OR REPLACE INTO titles VALUES (?, ?, ?, ?, ?)", titles)
+            db.commit()
+        return len(titles)
+
+    def count(self):
+        with closing(self.connect()) as db:
+            return db.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+
+    def lookup(self, title_ids):
+        title_ids = [title_id.strip().upper() for title_id in title_ids if title_id.strip()]
+        if not title_ids:
+            return None
+
+        wanted = title_ids + [f"{int(title_id, 16) | 0x800:016X}" for title_id in title_ids if re.fullmatch(r'[0-9A-F]{16}', title_id)]
+        with closing(self.connect()) as db:
+            rows = db.execute(f"SELECT * FROM titles WHERE title_id IN ({', '.join('?' * len(wanted))})", wanted).fetchall()
+
+        entries = {}
+        for title_id, name, languages, version, display_version in rows:
+            entries[title_id] = {
+                'title_id': title_id,
+                'version': f"v{version}",
+                'type': "Patch" if int(title_id, 16) & 0xFFF == 0x800 else "Application",
+                'display_version': display_version,
+                'name': name,
+                'languages': languages.split(",") if languages else []
+            }
+        if not any(title_id in entries for title_id in title_ids):
+            return None
+        return collect_titles(entries[title_id] for title_id in wanted if title_id in entries)
+
+    def clear(self):
+        with closing(self.connect()) as db:
+            db.execute("DELETE FROM titles")
+            db.commit()
+
+def title_database_path():
+    return os.path.join(settings_directory(), "title_database.sqlite3")
+
+def open_title_database():
+    return TitleDatabase(title_database_path())
+
+def title_database_fields(titles):
+    fields = metadata_fields(titles)
+    return {label: fields[label] for label in TITLE_DATABASE_FIELDS if label in fields}
+
+def title_row(xci_path, titles=None, error=""):
+    row = {"xci": xci_path}
+    row.update(zip(TITLE_FIELDS, titles or ([],) * len(TITLE_FIELDS)))
+    row["error"] = error
+    return row
+
+def list_titles_batch(xci_paths, hactoolnet_path, prod_keys_path, cache=None, jobs=METADATA_JOBS, result_callback=None, is_cancelled=None, mp_context=None):
+    rows = []
+
+    def finish(xci_path, titles=None, error=""):
+        row = title_row(xci_path, titles, error or ("" if titles[0] else "no titles found"))
+        rows.append(row)
+        if result_callback:
+            result_callback(row)
+
+    pending = []
+    for xci_path in xci_paths:
+        titles = cache.get(xci_path, prod_keys_path) if cache else None
+        if titles is not None:
+            finish(xci_path, titles)
+        else:
+            pending.append(xci_path)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(pending))), mp_context=mp_context) as executor:
+            futures = {executor.submit(list_titles, xci_path, hactoolnet_path, prod_keys_path): xci_path for xci_path in pending}
+            for future in as_completed(futures):
+                if is_cancelled and is_cancelled():
+                    for other in futures:
+                        other.cancel()
+                xci_path = futures[future]
+                if future.cancelled():
+                    finish(xci_path, error="cancelled")
+                    continue
+                try:
+                    titles = future.result()
+                except (OSError, ValueError, BrokenProcessPool) as e:
+                    finish(xci_path, error=str(e) or type(e).__name__)
+                    continue
+                if cache and titles[0]:
+                    cache.put(xci_path, prod_keys_path, titles)
+                finish(xci_path, titles)
+
+    order = {xci_path: index for index, xci_path in enumerate(xci_paths)}
+    rows.sort(key=lambda row: order[row["xci"]])
+    return rows
+
+def export_titles(rows, output_path):
+    with open(output_path, 'w', newline='', encoding='utf-8') as output_file:
+        if output_path.lower().endswith('.json'):
+            json.dump(rows, output_file, indent=2)
+            return
+
+        writer = csv.DictWriter(output_file, fieldnames=("xci",) + TITLE_FIELDS + ("error",))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: ', '.join(value) if isinstance(value, list) else value for key, value in row.items()})
+
+def format_title(title):
+    title = title.replace(":", " - ").replace("~", "-")
+    title = re.sub(r'[\\/:*?"<>|`]', '', title)
+    title = re.sub(r'\s+', ' ', title).strip()
+
+    words = title.split()
+    articles = {"a", "an", "the"}
+    link_words = {"and", "or", "but", "nor", "so", "yet", "for", "at", "by", "in", "on", "to", "of", "up", "with", "as", "per"}
+
+    formatted_words = [
+        word.lower() if (word.lower() in articles or word.lower() in link_words) else
+        word if (word.isupper() or word.isalpha()) else word.capitalize()
+        for word in words
+    ]
+
+    if formatted_words[0].lower() in articles:
+        article = formatted_words.pop(0).capitalize()
+        try:
+            sep_index = formatted_words.index('-')
+            formatted_words[sep_index - 1] += ','
+            formatted_words.insert(sep_index, article)
+        except ValueError:
+            formatted_words[-1] += ','
+            formatted_words.append(article)
+
+    return ' '.join(formatted_words)
+
+def metadata_fields(titles):
+    base_title_ids, update_title_ids, updates, versions, titles, languages = titles
+    fields = {}
+
+    if titles:
+        fields['Game Name'] = ', '.join(format_title(title) for title in titles)
+    if languages:
+        fields['Languages'] = ','.join(languages)
+    if base_title_ids:
+        fields['GameID1'] = ', '.join(base_title_ids)
+    if versions:
+        fields['Version'] = ', '.join(versions)
+    if updates:
+        fields['Update'] = ', '.join(updates)
+
+    return fields
+
+def build_submission_xml(submission):
+    datafile = ET.Element('datafile')
+    game = ET.SubElement(datafile, 'game', name=submission['game_name'])
+
+    region = submission['region']
+
+    archive_attrs = {
+        "clone": "P",
+        "name": submission['game_name'],
+        "region": region,
+        "languages": submission['languages'],
+        "langchecked": "unk",
+        "gameid1": submission['gameid1'],
+        "gameid2": submission['gameid2'],
+        "categories": "Games"
+    }
+
+    mediastamp = submission['mediastamp']
+    if mediastamp and re.match(r'^[a-f0-9]{3}$', mediastamp, re.IGNORECASE):
+        rev_value = int(mediastamp, 16)
+        if rev_value != 0:
+            archive_attrs["version1"] = f"Rev {rev_value}"
+
+    ET.SubElement(game, 'archive', **archive_attrs)
+
+    serials_attrs = {
+        "media_serial1": submission['media_serial1'],
+        "media_serial2": submission['media_serial2'].strip(),
+        "mediastamp": mediastamp,
+        "pcb_serial": submission['pcb_serial']
+    }
+
+    if submission['box_serial'] is not None:
+        serials_attrs["box_serial"] = submission['box_serial']
+
+    if submission['box_barcode'] is not None:
+        serials_attrs["box_barcode"] = submission['box_barcode']
+
+    scene = submission.get('scene')
+    if scene:
+        parent = ET.SubElement(game, 'release')
+
+        details = ET.SubElement(parent, 'details')
+        details.set("dirname", scene['dirname'])
+        details.set("nfoname", scene['nfoname'])
+        details.set("archivename", scene['archivename'])
+        details.set("region", region)
+        details.set("nfosize", scene['nfosize'])
+        details.set("nfocrc", scene['nfocrc'])
+        details.set("date", scene['date'])
+        details.set("group", scene['group'])
+    else:
+        parent = ET.SubElement(game, 'source')
+
+        comment1_lines = submission['comment1'].strip().split('\n')
+        comment1 = "&#10;".join(comment1_lines[:4])
+
+        ET.SubElement(parent, 'details',
+            section="Trusted Dump",
+            d_date=submission['dump_date'],
+            r_date="",
+            r_date_info="0",
+            region=region,
+            dumper=submission['dumper'],
+            project="No-Intro",
+            tool=submission['tool'],
+            comment1=comment1,
+            originalformat="Default",
+        )
+
+    ET.SubElement(parent, 'serials', **serials_attrs)
+
+    files = submission['files']
+
+    ET.SubElement(parent, 'file',
+        forcename="",
+        size=files[1]['File Size'],
+        crc32=files[1]['CRC32'].lower(),
+        md5=files[1]['MD5'],
+        sha1=files[1]['SHA1'],
+        sha256=files[1]['SHA256'],
+        extension="xci",
+        version=files[1]['Version'],
+        update_type=files[1]['Update'],
+        format="Default"
+    )
+
+    if not scene and submission['include_initial_area']:
+        ET.SubElement(parent, 'file',
+            forcename="",
+            size=files[2]['File Size'],
+            crc32=files[2]['CRC32'].lower(),
+            md5=files[2]['MD5'],
+            sha1=files[2]['SHA1'],
+            sha256=files[2]['SHA256'],
+            extension="bin",
+            item="Initial Area",
+            format="Default",
+            filter="Initial Area"
+        )
+
+        ET.SubElement(parent, 'file',
+            forcename="",
+            size=files[3]['File Size'],
+            crc32=files[3]['CRC32'].lower(),
+            md5=files[3]['MD5'],
+            sha1=files[3]['SHA1'],
+            sha256=files[3]['SHA256'],
+            extension="xci",
+            format="FullXCI"
+        )
+
+    xml_str = minidom.parseString(ET.tostring(datafile, encoding="utf-8")).toprettyxml(indent="    ")
+    return xml_str.replace("&amp;#10;", "&#10;")
+
+def submission_file_name(game_name, dumper, dump_date):
+    return f"{game_name} - {dumper} - {dump_date} Submission.xml"
+
+class SubmissionError(Exception):
+    pass
+
+CART_OPTIONS = [
+    "xci", "initial_area", "card_id", "game_name", "languages", "gameid1", "version", "update", "region",
+    "media_serial1", "media_serial2", "pcb_serial", "box_serial", "box_barcode", "loose_cart",
+    "dumper", "tool", "dump_date", "output_dir", "untrim"
+]
+
+def create_cart_submission(cart, cache=None, verify=False, import_metadata=True, quiet=False, read_options=None):
+    xci_path = cart['xci']
+    if not xci_path or not xci_path.lower().endswith('.xci') or not os.path.isfile(xci_path):
+        raise SubmissionError(f"Not a Default XCI file: {xci_path}")
+    try:
+        full_xci = is_full_xci(xci_path)
+    except InvalidXCIError:
+        raise SubmissionError(f"No valid XCI header found: {xci_path}")
+    if full_xci:
+        raise SubmissionError(f"This is a FullXCI, please provide a Default XCI: {xci_path}")
+
+    initial_area_path = cart.get('initial_area')
+    if initial_area_path and (not initial_area_path.endswith('.bin') or os.path.getsize(initial_area_path) != INITIAL_AREA_SIZE):
+        raise SubmissionError(f"Initial Area must be a .bin file that has a size of 512 bytes: {initial_area_path}")
+
+    untrim = str(cart.get('untrim') or "").lower() in ("1", "true", "yes")
+    with ThreadPoolExecutor(max_workers=1) as metadata_pool:
+        metadata_future = None
+        if import_metadata:
+            hactoolnet_path, prod_keys_path = find_hactoolnet()
+            if os.path.exists(prod_keys_path):
+                metadata_future = metadata_pool.submit(list_titles, xci_path, hactoolnet_path, prod_keys_path, open_metadata_cache() if cache else None)
+            elif not quiet:
+                print("prod.keys not found, skipping automatic metadata import")
+
+        default_results, full_xci_results, _ = hash_xci(xci_path, initial_area_path, cache=cache, verify=verify, quiet=quiet, untrim=untrim, **(read_options or {}))
+        metadata = {}
+        if metadata_future:
+            try:
+                metadata = metadata_fields(metadata_future.result())
+            except NCAError as e:
+                if not quiet:
+                    print(f"Skipping automatic metadata import: {e}")
+
+    gameid1 = cart.get('gameid1') or metadata.get('GameID1')
+    titles = open_title_database().lookup(gameid1.split(',')) if gameid1 and os.path.exists(title_database_path()) else None
+    if titles:
+        metadata = dict(title_database_fields(titles), **metadata)
+
+    files = {1: dict(default_results, Version=cart.get('version') or metadata.get('Version', ""), Update=cart.get('update') or metadata.get('Update', ""))}
+    if initial_area_path:
+        initial_area_hasher = MultiHasher()
+        with open(initial_area_path, 'rb') as initial_area_file:
+            initial_area_hasher.update(initial_area_file.read())
+        files[2] = initial_area_hasher.results()
+        files[3] = full_xci_results
+
+    loose_cart = str(cart.get('loose_cart') or "").lower() in ("1", "true", "yes")
+    media_serial1 = cart.get('media_serial1') or ""
+    media_serial2 = cart.get('media_serial2') or ""
+
+    submission = {
+        "game_name": cart.get('game_name') or metadata.get('Game Name', ""),
+        "region": cart.get('region') or "",
+        "languages": cart.get('languages') or metadata.get('Languages', ""),
+        "gameid1": cart.get('gameid1') or metadata.get('GameID1', ""),
+        "gameid2": game_id2_from_serial(media_serial1),
+        "mediastamp": mediastamp_from_serial(media_serial2),
+        "media_serial1": media_serial1,
+        "media_serial2": media_serial2,
+        "pcb_serial": cart.get('pcb_serial') or "",
+        "box_serial": None if loose_cart else cart.get('box_serial') or "",
+        "box_barcode": None if loose_cart else cart.get('box_barcode') or "",
+        "dump_date": cart.get('dump_date') or time.strftime('%Y-%m-%d'),
+        "dumper": cart.get('dumper') or "",
+        "tool": cart.get('tool') or "",
+        "comment1": card_id_comment(cart['card_id']) if cart.get('card_id') else "",
+        "include_initial_area": bool(initial_area_path),
+        "files": files
+    }
+
+    required = ["game_name", "region", "languages", "gameid1", "media_serial1", "media_serial2", "dumper", "tool", "comment1"]
+    if not loose_cart:
+        required += ["box_serial", "box_barcode"]
+    missing = [field for field in required if not submission[field]]
+    missing += [f"{label.lower()}" for label in ("Version", "Update") if not files[1][label]]
+    if missing:
+        raise SubmissionError(f"Missing fields for {os.path.basename(xci_path)}: {', '.join(missing)}")
+
+    output_dir = cart.get('output_dir') or os.path.dirname(xci_path) or "."
+    os.makedirs(output_dir, exist_ok=True)
+    file_path = os.path.join(output_dir, submission_file_name(cart.get('submission_name') or submission['game_name'], submission['dumper'], submission['dump_date']))
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(build_submission_xml(submission))
+
+    return file_path
+
+def load_manifest(manifest_path, defaults):
+    with open(manifest_path, newline='', encoding='utf-8') as manifest_file:
+        carts = []
+        for row in csv.DictReader(manifest_file):
+            cart = dict(defaults)
+            cart.update({key.strip().replace('-', '_'): value.strip() for key, value in row.items() if key and value and value.strip()})
+            carts.append(cart)
+        return carts
+
+def cart_title_prefix(file_path):
+    return re.split(r'[\[(]', os.path.splitext(os.path.basename(file_path))[0], maxsplit=1)[0].strip().lower()
+
+def cart_file_stem(file_path):
+    return re.sub(r'(\s*\([^)]*\))+$', '', os.path.splitext(os.path.basename(file_path))[0]).strip()
+
+def cart_file_key(file_path):
+    return cart_file_stem(file_path).lower()
+
+def match_cart_file(xci_path, candidates, xci_paths):
+    exact = [path for path in candidates if cart_file_key(path) == cart_file_key(xci_path)]
+    if exact:
+        return exact[0] if len(exact) == 1 else None
+
+    prefix = cart_title_prefix(xci_path)
+    xci_keys = {cart_file_key(path) for path in xci_paths}
+    siblings = [path for path in xci_paths if cart_title_prefix(path) == prefix]
+    loose = [path for path in candidates if cart_title_prefix(path) == prefix and cart_file_key(path) not in xci_keys]
+    return loose[0] if prefix and len(siblings) == 1 and len(loose) == 1 else None
+
+def discover_carts(root):
+    carts = []
+
+    for directory, _, file_names in os.walk(os.path.abspath(root)):
+        xci_paths = []
+        initial_area_paths = []
+        card_id_paths = []
+
+        for file_name in sorted(file_names):
+            file_path = os.path.join(directory, file_name)
+            if file_name.lower().endswith('.xci'):
+                try:
+                    if not is_full_xci(file_path):
+                        xci_paths.append(file_path)
+                except (InvalidXCIError, OSError) as e:
+                    carts.append({"xci": file_path, "initial_area": None, "card_id": None, "error": f"Can't read the XCI header: {e}"})
+            elif file_name.lower().endswith('.bin'):
+                lower_name = file_name.lower()
+                if "(certificate)" in lower_name:
+                    continue
+                try:
+                    is_initial_area = any(tag in lower_name for tag in ("(initial data)", "(initial area)")) and os.path.getsize(file_path) == INITIAL_AREA_SIZE
+                except OSError as e:
+                    print(f"Skipping unreadable file {file_path}: {e}")
+                    continue
+                if is_initial_area:
+                    initial_area_paths.append(file_path)
+                elif "card id" in lower_name:
+                    card_id_paths.append(file_path)
+
+        xci_keys = [cart_file_key(xci_path) for xci_path in xci_paths]
+        for xci_path in xci_paths:
+            unique_key = xci_keys.count(cart_file_key(xci_path)) == 1
+            submission_name = cart_file_stem(xci_path) if unique_key else os.path.splitext(os.path.basename(xci_path))[0]
+            cart = {"xci": xci_path, "initial_area": None, "card_id": None, "submission_name": submission_name}
+            for key, label, candidates in (("initial_area", "Initial Area", initial_area_paths), ("card_id", "Card ID Set", card_id_paths)):
+                cart[key] = match_cart_file(xci_path, candidates, xci_paths)
+                if cart[key] is None:
+                    print(f"No unambiguous {label} found for: {xci_path}")
+            carts.append(cart)
+
+    return carts
+
+class BatchQueue:
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.entries = {}
+
+        if os.path.exists(state_path):
+            with open(state_path, encoding='utf-8') as state_file:
+                self.entries = json.load(state_file)
+
+    def add(self, cart, retry_failed=False):
+        key = os.path.realpath(cart['xci'])
+        entry = self.entries.get(key)
+        if entry and entry['status'] == "done" and entry.get('output') and os.path.exists(entry['output']):
+            return False
+        if entry and entry['status'] == "failed" and not retry_failed:
+            return False
+        self.entries[key] = {"cart": cart, "status": "queued", "output": None, "error": None}
+        return True
+
+    def prune(self):
+        for key, entry in list(self.entries.items()):
+            if entry['status'] != "done" and not os.path.exists(entry['cart']['xci']):
+                del self.entries[key]
+                print(f"[dropped] {entry['cart']['xci']}: the XCI no longer exists")
+
+    def set_status(self, cart, status, output=None, error=None):
+        with self.lock:
+            entry = self.entries[os.path.realpath(cart['xci'])]
+            entry.update(status=status, output=output, error=error)
+            self.save()
+        print(f"[{status}] {cart['xci']}" + (f": {error}" if error else ""))
+
+    def save(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(self.entries, state_file, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def print_table(self):
+        print(f"\n{'Status':<10}Cart")
+        for key, entry in sorted(self.entries.items()):
+            detail = entry['output'] or entry['error'] or ""
+            print(f"{entry['status']:<10}{key}" + (f"\n{'':<10}-> {detail}" if detail else ""))
+
+def process_batch_cart(batch_queue, cart, cache, verify, import_metadata, quiet, read_options):
+    batch_queue.set_status(cart, "hashing")
+    try:
+        output = create_cart_submission(cart, cache, verify, import_metadata, quiet, read_options)
+    except (SubmissionError, OSError) as e:
+        batch_queue.set_status(cart, "failed", error=str(e))
+        return False
+    batch_queue.set_status(cart, "done", output=os.path.abspath(output))
+    return True
+
+def add_cart_arguments(parser):
+    parser.add_argument("--manifest", help="CSV with one cart per row, columns named after the options (e.g. xci, initial_area, media_serial1), empty cells fall back to the command line values")
+    parser.add_argument("--game-name")
+    parser.add_argument("--languages")
+    parser.add_argument("--gameid1")
+    parser.add_argument("--version", help="Display version, e.g. v1.0.2")
+    parser.add_argument("--update", help="Update version, e.g. v0")
+    parser.add_argument("--region", default="World")
+    parser.add_argument("--media-serial1")
+    parser.add_argument("--media-serial2")
+    parser.add_argument("--pcb-serial", default="")
+    parser.add_argument("--box-serial")
+    parser.add_argument("--box-barcode")
+    parser.add_argument("--loose-cart", action="store_true")
+    parser.add_argument("--untrim", action="store_true", help="Hash trimmed XCIs as if they were padded with 0xFF to the full cart size")
+    parser.add_argument("--dumper")
+    parser.add_argument("--tool", default="nxdt_rw_poc v2.0.0 (rewrite-dirty)")
+    parser.add_argument("--dump-date", help="Defaults to today, yyyy-MM-dd")
+    parser.add_argument("--output-dir", help="Defaults to the directory of each XCI")
+    parser.add_argument("--no-metadata", action="store_true", help="Skip the automatic metadata import")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the hash and metadata caches")
+    parser.add_argument("--verify", action="store_true", help="Re-hash even if cached hashes exist")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of carts to process at once")
+    parser.add_argument("--hash-backend", choices=HASH_BACKENDS, default="readinto", help="How XCIs are read for hashing")
+    parser.add_argument("--block-size", type=int, default=READ_BLOCK_SIZE // 1048576, help="Read block size in MB")
+    parser.add_argument("--queue-depth", type=int, default=PREFETCH_QUEUE_DEPTH, help="Reads kept in flight by the prefetch backend, raise it for network shares")
+    parser.add_argument("--page-cache", choices=CACHE_MODES, default="drop", help="drop: evict XCI pages from the page cache behind the reader, keep: leave them cached, direct: bypass the page cache with O_DIRECT where supported")
+
+def build_cli_parser():
+    parser = argparse.ArgumentParser(description="No-Intro Switch Cart Submission Tool, run without arguments to open the GUI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit = subparsers.add_parser("submit", help="Hash a cart and write its submission XML")
+    submit.add_argument("--xci", help="Default XCI")
+    submit.add_argument("--initial-area", help="512-byte Initial Area .bin, enables the Initial Area and FullXCI entries")
+    submit.add_argument("--card-id", help="Card ID Set .bin")
+    add_cart_arguments(submit)
+
+    batch = subparsers.add_parser("batch", help="Find every cart under a directory and write one submission XML per cart")
+    batch.add_argument("root", help="Directory tree with Default XCIs, 512-byte Initial Area .bin files and Card ID Set .bin files")
+    batch.add_argument("--state", help="Queue file used to resume an interrupted run, defaults to .submission-queue.json in the root directory")
+    batch.add_argument("--retry-failed", action="store_true", help="Also requeue carts that failed in a previous run")
+    add_cart_arguments(batch)
+
+    untrim = subparsers.add_parser("untrim", help="Write a copy of a trimmed XCI padded with 0xFF to the full cart size, the padding takes real disk space")
+    untrim.add_argument("xci", help="Trimmed Default XCI or FullXCI")
+    untrim.add_argument("output", help="Path of the untrimmed copy")
+
+    rar = subparsers.add_parser("rar", help="Unpack the XCI of a scene RAR set in memory, check it against the CRC32 stored in the RAR and print its hashes")
+    rar.add_argument("rar", help="First volume of the RAR set")
+    rar.add_argument("--password")
+    rar.add_argument("--extract-dir", help="Also write the unpacked XCI to this directory in the same pass")
+
+    index = subparsers.add_parser("index", help="Index every scene release under a library directory so the GUI can pick them without rescanning")
+    index.add_argument("root", help="Scene library directory")
+    index.add_argument("--list", action="store_true", help="Print every indexed release afterwards")
+
+    sfv = subparsers.add_parser("sfv", help="Check scene RAR volumes against their SFV file")
+    sfv.add_argument("sfv", help="SFV file, volumes are looked up next to it")
+    sfv.add_argument("--jobs", type=int, default=SFV_VERIFY_JOBS, help="Number of volumes to check at once")
+    sfv.add_argument("--stop-on-mismatch", action="store_true", help="Stop at the first missing or mismatched volume")
+
+    titles = subparsers.add_parser("titles", help="Import the title metadata of many XCIs and export it as CSV or JSON")
+    titles.add_argument("xci", nargs="+", help="XCIs or directories to search for XCIs")
+    titles.add_argument("--output", help="Write the combined titles to this .csv or .json file")
+    titles.add_argument("--jobs", type=int, default=METADATA_JOBS, help="Number of XCIs to read at once, each in its own process")
+    titles.add_argument("--no-cache", action="store_true", help="Don't read or write the metadata cache")
+
+    titledb = subparsers.add_parser("titledb", help="Load a title database dump for offline metadata lookups, or look up Title IDs in it")
+    titledb.add_argument("title_id", nargs="*", help="Title IDs to look up")
+    titledb.add_argument("--load", action="append", default=[], help="JSON or CSV dump to add to the database, can be repeated")
+    titledb.add_argument("--clear", action="store_true", help="Remove every title before loading")
+
+    verify = subparsers.add_parser("verify", help="Check the HFS0 partition hashes of XCIs without hashing the whole file")
+    verify.add_argument("xci", nargs="+", help="Default XCIs or FullXCIs")
+    verify.add_argument("--jobs", type=int, default=VERIFY_JOBS, help="Number of parallel reads")
+
+    return parser
+
+def read_options(args):
+    return {
+        "backend": args.hash_backend,
+        "cache_mode": args.page_cache,
+        "block_size": max(1, args.block_size) * 1048576,
+        "queue_depth": args.queue_depth
+    }
+
+def cart_defaults(args):
+    defaults = {option: getattr(args, option, None) for option in CART_OPTIONS}
+    defaults['loose_cart'] = "1" if args.loose_cart else ""
+    defaults['untrim'] = "1" if args.untrim else ""
+    return defaults
+
+def run_submit(args):
+    defaults = cart_defaults(args)
+    carts = load_manifest(args.manifest, defaults) if args.manifest else [defaults]
+    cache = None if args.no_cache else open_hash_cache()
+    quiet = args.jobs > 1 and len(carts) > 1
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {
+            executor.submit(create_cart_submission, cart, cache, args.verify, not args.no_metadata, quiet, read_options(args)): cart
+            for cart in carts
+        }
+        for future in as_completed(futures):
+            try:
+                print(f"Submission written to: {future.result()}")
+            except (SubmissionError, OSError) as e:
+                failures += 1
+                print(f"Failed: {e}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+def run_batch(args):
+    defaults = cart_defaults(args)
+    overrides = {}
+    if args.manifest:
+        for row in load_manifest(args.manifest, {}):
+            overrides[os.path.basename(row.get('xci', ""))] = row
+
+    batch_queue = BatchQueue(args.state or os.path.join(args.root, ".submission-queue.json"))
+
+    batch_queue.prune()
+    for discovered in discover_carts(args.root):
+        error = discovered.pop('error', None)
+        cart = dict(defaults)
+        cart.update(discovered)
+        cart.update({key: value for key, value in overrides.get(os.path.basename(discovered['xci']), {}).items() if key != 'xci'})
+        if batch_queue.add(cart, args.retry_failed) and error:
+            batch_queue.set_status(cart, "failed", error=error)
+    batch_queue.save()
+
+    pending = [entry['cart'] for entry in batch_queue.entries.values() if entry['status'] == "queued"]
+    print(f"{len(pending)} carts queued, {len(batch_queue.entries) - len(pending)} already processed")
+
+    cache = None if args.no_cache else open_hash_cache()
+    quiet = args.jobs > 1
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        results = list(executor.map(lambda cart: process_batch_cart(batch_queue, cart, cache, args.verify, not args.no_metadata, quiet, read_options(args)), pending))
+
+    batch_queue.print_table()
+    return 0 if all(results) else 1
+
+def run_untrim(args):
+    try:
+        header = read_xci_header(args.xci)
+    except (InvalidXCIError, OSError) as e:
+        print(f"{args.xci}: {e}", file=sys.stderr)
+        return 1
+
+    if not header.is_trimmed:
+        print(f"{args.xci} is not trimmed, nothing to do")
+        return 0
+
+    untrim_xci_file(args.xci, args.output)
+    return 0
+
+def run_rar(args):
+    import rarfile
+
+    try:
+        results, _ = hash_rar_member(args.rar, args.password, args.extract_dir)
+    except (RarIntegrityError, InvalidXCIError, rarfile.Error, OSError) as e:
+        print(f"{args.rar}: {e}", file=sys.stderr)
+        return 1
+
+    for label, value in results.items():
+        print(f"{label}: {value}")
+    return 0
+
+def run_index(args):
+    scene_index = open_scene_index()
+    start_time = time.perf_counter()
+    counts = scene_index.scan(args.root)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged, {counts['removed']} removed in {elapsed:.2f} seconds")
+    if args.list:
+        for release in scene_index.releases():
+            print(f"{release['dirname']}  {release['archivename'] or '-'}  {release['nfoname'] or '-'}  {release['nfocrc'] or '-'}")
+    return 0
+
+def run_sfv(args):
+    def print_result(result):
+        for line in sfv_result_lines(result):
+            print(line)
+
+    results, elapsed = verify_sfv(args.sfv, args.jobs, args.stop_on_mismatch, print_result)
+    failures = [result for result in results if result.failed]
+
+    print(f"\n{sfv_summary(results, elapsed)}")
+    if failures:
+        print("Mismatched CRCs were found:")
+        for result in failures:
+            print(f"- {result.file_name}")
+        return 1
+
+    print("All CRCs matched successfully")
+    return 0
+
+def find_xcis(paths):
+    xci_paths = []
+    for path in paths:
+        if not os.path.isdir(path):
+            xci_paths.append(path)
+            continue
+        for directory, _, file_names in os.walk(path):
+            xci_paths.extend(os.path.join(directory, file_name) for file_name in sorted(file_names) if file_name.lower().endswith('.xci'))
+    return xci_paths
+
+def run_titles(args):
+    hactoolnet_path, prod_keys_path = find_hactoolnet()
+    if not os.path.exists(prod_keys_path):
+        print("prod.keys not found, it must be in the same directory as the script", file=sys.stderr)
+        return 1
+
+    def print_row(row):
+        if row["error"]:
+            print(f"{row['xci']}: {row['error']}", file=sys.stderr)
+        else:
+            print(f"{row['xci']}: {', '.join(row['base_title_ids'])}  {', '.join(row['titles'])}  {', '.join(row['versions'])}  {', '.join(row['updates'])}  {','.join(row['languages'])}")
+
+    start_time = time.perf_counter()
+    rows = list_titles_batch(find_xcis(args.xci), hactoolnet_path, prod_keys_path, None if args.no_cache else open_metadata_cache(), args.jobs, print_row)
+    print(f"\n{len(rows)} XCIs processed in {time.perf_counter() - start_time:.2f} seconds")
+
+    if args.output:
+        export_titles(rows, args.output)
+        print(f"Titles written to: {args.output}")
+    return 1 if any(row["error"] for row in rows) else 0
+
+def run_titledb(args):
+    title_database = open_title_database()
+    if args.clear:
+        title_database.clear()
+
+    for source_path in args.load:
+        try:
+            print(f"{title_database.load(source_path)} titles loaded from: {source_path}")
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"{source_path}: {e}", file=sys.stderr)
+            return 1
+    if args.load or args.clear:
+        print(f"{title_database.count()} titles in the database")
+
+    missing = 0
+    for title_id in args.title_id:
+        titles = title_database.lookup([title_id])
+        fields = metadata_fields(titles) if titles else {}
+        if not fields:
+            missing += 1
+            print(f"{title_id}: not found", file=sys.stderr)
+            continue
+        print(f"{title_id}: " + "  ".join(f"{label}: {value}" for label, value in fields.items()))
+    return 1 if missing else 0
+
+def run_verify(args):
+    failed = 0
+
+    for xci_path in args.xci:
+        start_time = time.perf_counter()
+        try:
+            entries, failures = verify_xci_integrity(xci_path, args.jobs)
+        except (InvalidXCIError, OSError) as e:
+            failed += 1
+            print(f"{xci_path}: {e}", file=sys.stderr)
+            continue
+
+        elapsed = time.perf_counter() - start_time
+        if failures:
+            failed += 1
+            print(f"{xci_path}: {len(failures)} of {len(entries)} entries failed")
+            for failure in failures:
+                print(f"  {failure}")
+        else:
+            print(f"{xci_path}: OK, {len(entries)} entries verified in {elapsed:.2f} seconds")
+
+    return 1 if failed else 0
+
+def main_cli(argv):
+    args = build_cli_parser().parse_args(argv)
+    if args.command == "submit":
+        return run_submit(args)
+    if args.command == "batch":
+        return run_batch(args)
+    if args.command == "untrim":
+        return run_untrim(args)
+    if args.command == "rar":
+        return run_rar(args)
+    if args.command == "index":
+        return run_index(args)
+    if args.command == "sfv":
+        return run_sfv(args)
+    if args.command == "titles":
+        return run_titles(args)
+    if args.command == "titledb":
+        return run_titledb(args)
+    if args.command == "verify":
+        return run_verify(args)
@@ -1,20 +1,132 @@
 import sys
-from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton, QFileDialog, QInputDialog, QComboBox, QPlainTextEdit, QGroupBox, QDialog, QTabWidget, QCheckBox, QDateEdit, QSizePolicy, QMessageBox, QTextEdit
-)
-from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QRegularExpressionValidator
-from PyQt6.QtCore import Qt, QDate, QRegularExpression, QSettings
+
+from cart_submission_core import CLI_COMMANDS, main_cli
+
+if __name__ == '__main__' and len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS + ("-h", "--help"):
+    sys.exit(main_cli(sys.argv[1:]))
+
 import hashlib
-import zlib
-import rarfile
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import os
 import subprocess
 import platform
 import time
 import csv
 import re
+import multiprocessing
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton, QFileDialog, QInputDialog, QComboBox, QPlainTextEdit, QGroupBox, QDialog, QTabWidget, QCheckBox, QDateEdit, QSizePolicy, QMessageBox, QTextEdit, QProgressBar, QTableWidget, QTableWidgetItem, QSpinBox
+)
+from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QRegularExpressionValidator
+from PyQt6.QtCore import Qt, QDate, QRegularExpression, QSettings, QThread, pyqtSignal
+import rarfile
+
+from cart_submission_core import (
+    INITIAL_AREA_SIZE, METADATA_JOBS, TITLE_FIELDS, HashCancelled, ChunkedReader, HASH_BACKENDS, CACHE_MODES, PREFETCH_QUEUE_DEPTH, MultiHasher, open_hash_cache, full_xci_cache_variant, hash_xci, verify_sfv, sfv_summary, sfv_result_lines, open_scene_index, rar_extract_path, hash_rar_member, generate_full_xci_file, truncate_full_xci_file, InvalidXCIError, is_full_xci, verify_xci_integrity, mediastamp_from_serial, game_id2_from_serial, card_id_comment, find_hactoolnet, open_metadata_cache, list_titles, open_title_database, title_database_fields, list_titles_batch, export_titles, format_title, metadata_fields, build_submission_xml, submission_file_name
+)
+
+class HashWorker(QThread):
+    progress = pyqtSignal(object, object)
+    hashes_ready = pyqtSignal(object, object, object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, default_xci_path, initial_area_path=None, cache=None, verify=False, untrim=False, backend="readinto", cache_mode="drop", queue_depth=PREFETCH_QUEUE_DEPTH, parent=None):
+        super().__init__(parent)
+        self.default_xci_path = default_xci_path
+        self.initial_area_path = initial_area_path
+        self.cache = cache
+        self.verify = verify
+        self.untrim = untrim
+        self.backend = backend
+        self.cache_mode = cache_mode
+        self.queue_depth = queue_depth
+
+    def run(self):
+        try:
+            default_results, full_xci_results, timings = hash_xci(
+                self.default_xci_path, self.initial_area_path,
+                progress_callback=self.progress.emit, is_cancelled=self.isInterruptionRequested,
+                cache=self.cache, verify=self.verify, untrim=self.untrim, backend=self.backend,
+                cache_mode=self.cache_mode, queue_depth=self.queue_depth
+            )
+            self.hashes_ready.emit(default_results, full_xci_results, timings)
+        except HashCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+class RarHashWorker(HashWorker):
+    def __init__(self, rar_path, password=None, extract_dir=None, parent=None):
+        super().__init__(None, parent=parent)
+        self.rar_path = rar_path
+        self.password = password
+        self.extract_dir = extract_dir
+
+    def run(self):
+        try:
+            results, timings = hash_rar_member(
+                self.rar_path, self.password, self.extract_dir,
+                progress_callback=self.progress.emit, is_cancelled=self.isInterruptionRequested
+            )
+            self.hashes_ready.emit(results, None, timings)
+        except HashCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+class SfvVerifyWorker(QThread):
+    result = pyqtSignal(object)
+    verified = pyqtSignal(object, float)
+    failed = pyqtSignal(str)
+
+    def __init__(self, sfv_path, stop_on_mismatch=False, parent=None):
+        super().__init__(parent)
+        self.sfv_path = sfv_path
+        self.stop_on_mismatch = stop_on_mismatch
+
+    def run(self):
+        try:
+            results, elapsed = verify_sfv(
+                self.sfv_path, stop_on_mismatch=self.stop_on_mismatch,
+                result_callback=self.result.emit, is_cancelled=self.isInterruptionRequested
+            )
+            self.verified.emit(results, elapsed)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+class MetadataWorker(QThread):
+    titles_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, xci_path, hactoolnet_path, prod_keys_path, cache=None, parent=None):
+        super().__init__(parent)
+        self.xci_path = xci_path
+        self.hactoolnet_path = hactoolnet_path
+        self.prod_keys_path = prod_keys_path
+        self.cache = cache
+
+    def run(self):
+        try:
+            self.titles_ready.emit(list_titles(self.xci_path, self.hactoolnet_path, self.prod_keys_path, self.cache))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+class MetadataBatchWorker(QThread):
+    result = pyqtSignal(object)
+
+    def __init__(self, xci_paths, hactoolnet_path, prod_keys_path, cache=None, parent=None):
+        super().__init__(parent)
+        self.xci_paths = xci_paths
+        self.hactoolnet_path = hactoolnet_path
+        self.prod_keys_path = prod_keys_path
+        self.cache = cache
+        self.rows = []
+
+    def run(self):
+        self.rows = list_titles_batch(
+            self.xci_paths, self.hactoolnet_path, self.prod_keys_path, self.cache,
+            result_callback=self.result.emit, is_cancelled=self.isInterruptionRequested, mp_context=multiprocessing.get_context("spawn")
+        )
 
 class XMLGeneratorApp(QMainWindow):
     def __init__(self):
@@ -33,6 +145,10 @@ class XMLGeneratorApp(QMainWindow):
         self.default_xci_path = None
         self.initial_area_path = None
         self.fields_count = 0
+        self.hash_worker = None
+        self.sfv_worker = None
+        self.metadata_worker = None
+        self.calculate_hashes_dialog = None
 
         self.tool_options = ["nxdt_rw_poc v2.0.0 (rewrite-dirty)", "DBI", "nxdumptool v1.1.15", "MigDumpTool (nxdumptool-rewrite)"]
 
@@ -58,6 +174,11 @@ class XMLGeneratorApp(QMainWindow):
         self.default_dumper = self.settings.value("defaultDumper", "")
         self.default_tool = self.settings.value("defaultTool", "nxdt_rw_poc v2.0.0 (rewrite-dirty)")
 
+        self.hash_cache = open_hash_cache()
+        self.metadata_cache = open_metadata_cache()
+        self.title_database = open_title_database()
+        self.scene_index = open_scene_index()
+
         self.initUI()
 
     def initUI(self):
@@ -73,11 +194,15 @@ class XMLGeneratorApp(QMainWindow):
         self.manual_import_button = QPushButton("Manually Import Metadata")
         self.manual_import_button.clicked.connect(self.open_manual_import_nx_game_info_dialog)
         self.basic_info_form_layout.addRow(self.manual_import_button)
+        self.load_title_database_button = QPushButton("Load Title Database")
+        self.load_title_database_button.clicked.connect(self.load_title_database)
+        self.basic_info_form_layout.addRow(self.load_title_database_button)
         self.basic_info_labels = [
             ("Game Name", "All nouns, verbs, & adjectives are uppercase, move initial articles to the end of the name, intermediary link words are lowercase, replace : and ~ with -, no \\ / * ? \" < > | , e.g. 'Legend of Zelda, The - A Link to the Past'"),
             ("Languages", "Comma-separated in ISO 639-1 format, e.g. English, Japanese, Korean, Simplified Chinese, Traditional Chinese is 'en,ja,ko,Zh-Hans,Zh-Hant'"),
             ("GameID1", "All base application Title IDs (ending in 000) comma-separated, no patches, no add-ons, e.g. '0100182014022000, 010065A014024000'")]
         self.basic_info_inputs = self.create_form_group(self.basic_info_labels, self.basic_info_form_layout)
+        self.basic_info_inputs['GameID1'].textChanged.connect(self.lookup_title_database)
 
         self.region_combo_box = QComboBox()
         self.region_combo_box.addItems(self.region_options)
@@ -167,8 +292,56 @@ class XMLGeneratorApp(QMainWindow):
         self.truncate_full_xci_button.clicked.connect(self.open_truncate_full_xci_dialog)
         button_layout.addWidget(self.truncate_full_xci_button)
 
+        self.verify_integrity_button = QPushButton("Verify XCI Integrity")
+        self.verify_integrity_button.clicked.connect(self.verify_xci_integrity)
+        button_layout.addWidget(self.verify_integrity_button)
+
         self.file_info_layout.addLayout(button_layout)
 
+        hash_cache_layout = QHBoxLayout()
+
+        self.verify_hashes_checkbox = QCheckBox("Verify Anyway (ignore cached hashes)")
+        hash_cache_layout.addWidget(self.verify_hashes_checkbox)
+
+        self.untrim_hashes_checkbox = QCheckBox("Hash as Untrimmed (pad with 0xFF to the cart size)")
+        hash_cache_layout.addWidget(self.untrim_hashes_checkbox)
+
+        self.import_metadata_while_hashing_checkbox = QCheckBox("Import Metadata While Hashing")
+        hash_cache_layout.addWidget(self.import_metadata_while_hashing_checkbox)
+
+        hash_cache_layout.addWidget(QLabel("Read Method:"))
+        self.hash_backend_combo = QComboBox()
+        self.hash_backend_combo.addItems(HASH_BACKENDS)
+        self.hash_backend_combo.setCurrentText(self.settings.value("hashBackend", "readinto"))
+        hash_cache_layout.addWidget(self.hash_backend_combo)
+
+        hash_cache_layout.addWidget(QLabel("Queue Depth:"))
+        self.queue_depth_spinbox = QSpinBox()
+        self.queue_depth_spinbox.setRange(1, 64)
+        self.queue_depth_spinbox.setValue(int(self.settings.value("queueDepth", PREFETCH_QUEUE_DEPTH)))
+        self.queue_depth_spinbox.setEnabled(self.hash_backend_combo.currentText() == "prefetch")
+        hash_cache_layout.addWidget(self.queue_depth_spinbox)
+
+        hash_cache_layout.addWidget(QLabel("Page Cache:"))
+        self.cache_mode_combo = QComboBox()
+        self.cache_mode_combo.addItems(CACHE_MODES)
+        self.cache_mode_combo.setCurrentText(self.settings.value("cacheMode", "drop"))
+        hash_cache_layout.addWidget(self.cache_mode_combo)
+
+        self.hash_backend_combo.currentTextChanged.connect(self.save_read_method)
+        self.queue_depth_spinbox.valueChanged.connect(self.save_read_method)
+        self.cache_mode_combo.currentTextChanged.connect(self.save_read_method)
+
+        self.hash_cache_label = QLabel()
+        hash_cache_layout.addWidget(self.hash_cache_label)
+
+        self.clear_hash_cache_button = QPushButton("Clear Hash Cache")
+        self.clear_hash_cache_button.clicked.connect(self.clear_hash_cache)
+        hash_cache_layout.addWidget(self.clear_hash_cache_button)
+
+        self.file_info_layout.addLayout(hash_cache_layout)
+        self.update_hash_cache_label()
+
         self.create_file_info_section(self.file_info_layout)
 
         self.file_info_tab.setLayout(self.file_info_layout)
@@ -182,6 +355,18 @@ class XMLGeneratorApp(QMainWindow):
         self.select_directory_button.clicked.connect(self.select_directory)
         self.scene_cart_form_layout.addRow(self.select_directory_button)
 
+        scene_library_layout = QHBoxLayout()
+
+        self.index_scene_library_button = QPushButton("Index Scene Library")
+        self.index_scene_library_button.clicked.connect(self.index_scene_library)
+        scene_library_layout.addWidget(self.index_scene_library_button)
+
+        self.pick_scene_release_button = QPushButton("Pick Release From Library")
+        self.pick_scene_release_button.clicked.connect(self.pick_scene_release)
+        scene_library_layout.addWidget(self.pick_scene_release_button)
+
+        self.scene_cart_form_layout.addRow(scene_library_layout)
+
         self.scene_directory_label = QLabel("No directory selected")
         self.scene_directory_label.setWordWrap(True)
         self.scene_cart_form_layout.addRow(QLabel("Selected Directory:"), self.scene_directory_label)
@@ -196,6 +381,10 @@ class XMLGeneratorApp(QMainWindow):
         self.verify_rars_button.clicked.connect(self.verify_scene_rars)
         self.scene_cart_form_layout.addRow(self.verify_rars_button)
 
+        self.stop_on_mismatch_checkbox = QCheckBox("Stop on First Mismatch")
+        self.stop_on_mismatch_checkbox.setEnabled(False)
+        self.scene_cart_form_layout.addRow(self.stop_on_mismatch_checkbox)
+
         self.extract_button = QPushButton("Extract RARs")
         self.extract_button.setEnabled(False)
         self.extract_button.clicked.connect(self.extract_rar)
@@ -207,6 +396,15 @@ class XMLGeneratorApp(QMainWindow):
 
         self.scene_cart_form_layout.addRow(self.keep_scene_rar_checkbox)
 
+        self.hash_rar_button = QPushButton("Hash XCI From RARs")
+        self.hash_rar_button.setEnabled(False)
+        self.hash_rar_button.clicked.connect(self.hash_scene_rar)
+        self.scene_cart_form_layout.addRow(self.hash_rar_button)
+
+        self.extract_while_hashing_checkbox = QCheckBox("Extract While Hashing")
+        self.extract_while_hashing_checkbox.setEnabled(False)
+        self.scene_cart_form_layout.addRow(self.extract_while_hashing_checkbox)
+
         self.scene_group_dropdown = QComboBox()
         self.scene_group_dropdown.addItems([
             "2K", "AUGETY", "BANDAI", "BigBlueBox", "BLASTCiTY", "Console", "DarKmooN", "DELiGHT",
@@ -553,50 +751,40 @@ class XMLGeneratorApp(QMainWindow):
 
     def update_hashes(self, file_path):
         print(f"Starting hash calculation for: {file_path}")
-        total_size = os.path.getsize(file_path)
-        processed_size = 0
 
-        size = str(total_size)
-        print("Calculated file size.")
-
-        crc32 = 0
-        hasher_md5 = hashlib.md5()
-        hasher_sha1 = hashlib.sha1()
-        hasher_sha256 = hashlib.sha256()
+        if file_path.endswith('.xci'):
+            if self.is_hashing():
+                QMessageBox.warning(self, "Hashing In Progress", "Please wait for the current hash calculation to finish or cancel it first")
+                return
+            self.default_xci_path = file_path
+            self.calculate_full_xci_hashes()
+        elif file_path.endswith('.bin') and os.path.getsize(file_path) == INITIAL_AREA_SIZE:
+            self.initial_area_path = file_path
+            hasher = MultiHasher()
+            with open(file_path, 'rb') as f:
+                hasher.update(f.read())
+            self.fill_file_inputs(2, hasher.results())
+            print("Completed hash calculation for:", file_path)
 
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(4096):
-                processed_size += len(chunk)
-                crc32 = zlib.crc32(chunk, crc32)
-                hasher_md5.update(chunk)
-                hasher_sha1.update(chunk)
-                hasher_sha256.update(chunk)
+        self.update_display()
 
-                progress = (processed_size / total_size) * 100
-                sys.stdout.write(f"\rCalculating hashes... {progress:.0f}%")
-                sys.stdout.flush()
+    def fill_file_inputs(self, index, results):
+        for label, value in results.items():
+            self.file_inputs[f"{label} {index}"].setText(value)
 
-        print("\nCompleted hash calculation for:", file_path)
+    def fill_converted_hashes(self, results, initial_area_path, default_xci_path):
+        with open(initial_area_path, 'rb') as initial_area_file:
+            initial_area = initial_area_file.read()
+        self.hash_cache.put(default_xci_path, results[1])
+        self.hash_cache.put(default_xci_path, results[3], full_xci_cache_variant(initial_area))
 
-        crc32 = format(crc32 & 0xFFFFFFFF, '08x')
-        md5 = hasher_md5.hexdigest()
-        sha1 = hasher_sha1.hexdigest()
-        sha256 = hasher_sha256.hexdigest()
+        self.default_xci_path = default_xci_path
+        self.fill_file_inputs(1, results[1])
 
-        if file_path.endswith('.xci'):
-            self.default_xci_path = file_path
-            self.file_inputs['File Size 1'].setText(size)
-            self.file_inputs['CRC32 1'].setText(crc32)
-            self.file_inputs['MD5 1'].setText(md5)
-            self.file_inputs['SHA1 1'].setText(sha1)
-            self.file_inputs['SHA256 1'].setText(sha256)
-        elif file_path.endswith('.bin') and os.path.getsize(file_path) == 512:
-            self.initial_area_path = file_path
-            self.file_inputs['File Size 2'].setText(size)
-            self.file_inputs['CRC32 2'].setText(crc32)
-            self.file_inputs['MD5 2'].setText(md5)
-            self.file_inputs['SHA1 2'].setText(sha1)
-            self.file_inputs['SHA256 2'].setText(sha256)
+        if self.include_initial_area_checkbox.isChecked() and not self.scene_release_checkbox.isChecked():
+            self.initial_area_path = initial_area_path
+            self.fill_file_inputs(2, results[2])
+            self.fill_file_inputs(3, results[3])
 
         self.update_display()
 
@@ -605,40 +793,17 @@ class XMLGeneratorApp(QMainWindow):
 
     def calculate_hash(self, file_path, hash_type):
         hasher = hashlib.new(hash_type)
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+        with open(file_path, 'rb', buffering=0) as f:
+            for chunk in ChunkedReader(f):
                 hasher.update(chunk)
         return hasher.hexdigest()
 
-    def calculate_crc32(self, file_path):
-        crc32 = 0
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                crc32 = zlib.crc32(chunk, crc32)
-        return format(crc32 & 0xFFFFFFFF, '08x')
-
     def open_import_nx_game_info_dialog(self):
         script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.hactoolnet_path, prod_keys_path = find_hactoolnet()
 
-        if platform.system() == "Windows":
-            self.hactoolnet_path = os.path.join(script_dir, "hactoolnet.exe")
-            required_files = [
-                os.path.join(script_dir, "hactoolnet.exe"),
-                os.path.join(script_dir, "prod.keys"),
-                os.path.join(script_dir, "LibHac.dll")
-            ]
-        else:
-            self.hactoolnet_path = os.path.join(script_dir, "hactoolnet")
-            required_files = [
-                os.path.join(script_dir, "hactoolnet"),
-                os.path.join(script_dir, "prod.keys")
-            ]
-
-        missing_files = [file for file in required_files if not os.path.exists(file)]
-
-        if missing_files:
-            missing_files_display = [os.path.basename(file) for file in missing_files]
-            QMessageBox.critical(self, "Missing Files", f"The following required files are missing: {', '.join(missing_files_display)}\n\nPlease ensure they are in the same directory as this script:\n{script_dir}")
+        if not os.path.exists(prod_keys_path):
+            QMessageBox.critical(self, "Missing Files", f"The following required files are missing: prod.keys\n\nPlease ensure they are in the same directory as this script:\n{script_dir}")
             return
 
         dialog = ImportNXGameInfoDialog(self)
@@ -648,6 +813,35 @@ class XMLGeneratorApp(QMainWindow):
         dialog = ManualImportNXGameInfoDialog(self)
         dialog.exec()
 
+    def load_title_database(self):
+        source_path, _ = QFileDialog.getOpenFileName(self, "Select a Title Database Dump", "", "Title Database (*.json *.csv)")
+        if not source_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            loaded = self.title_database.load(source_path)
+        except (OSError, ValueError, csv.Error) as e:
+            QMessageBox.critical(self, "Title Database", f"Could not load {source_path}: {str(e)}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        QMessageBox.information(self, "Title Database", f"{loaded} titles loaded, {self.title_database.count()} titles in the database\n\nEntering a GameID1 now fills the empty metadata fields from it")
+        self.lookup_title_database()
+
+    def lookup_title_database(self):
+        title_ids = [title_id.strip() for title_id in self.basic_info_inputs['GameID1'].text().split(',')]
+        if not all(re.fullmatch(r'[0-9A-Fa-f]{16}', title_id) for title_id in title_ids):
+            return
+
+        titles = self.title_database.lookup(title_ids)
+        fields = title_database_fields(titles) if titles else {}
+        self.fill_metadata({label: value for label, value in fields.items() if not self.metadata_input(label).text().strip()})
+
+    def metadata_input(self, label):
+        return self.basic_info_inputs[label] if label in self.basic_info_inputs else self.file_inputs[f"{label} 1"]
+
     def import_nx_game_info(self, game_info):
 
         cleaned_title_name = game_info['title_name'].replace(":", " -").encode('utf-8').decode('utf-8')
@@ -784,7 +978,7 @@ class XMLGeneratorApp(QMainWindow):
     def drop_initial_area(self, event: QDropEvent):
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
-            if file_path.endswith('.bin') and os.path.getsize(file_path) == 512:
+            if file_path.endswith('.bin') and os.path.getsize(file_path) == INITIAL_AREA_SIZE:
                 self.initial_area_path = file_path
                 self.process_file(file_path)
                 if platform.system() == "Windows":
@@ -799,9 +993,27 @@ class XMLGeneratorApp(QMainWindow):
         layout = QVBoxLayout()
         self.calculate_hashes_dialog.setLayout(layout)
 
-        label = QLabel("Drag and Drop Default XCI here to calculate the hashes\n\nThe program will appear to freeze, it's just calculating all the hashes which can take a while\n\nCheck the terminal for the current status\n\nPlease be patient")
-        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(label)
+        self.calculate_hashes_label = QLabel("Drag and Drop Default XCI here to calculate the hashes\n\nHashing runs in the background, you can keep filling out the other tabs while it's running")
+        self.calculate_hashes_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.calculate_hashes_label)
+
+        self.hash_progress_bar = QProgressBar()
+        self.hash_progress_bar.setRange(0, 1000)
+        self.hash_progress_bar.setValue(0)
+        layout.addWidget(self.hash_progress_bar)
+
+        self.hash_status_label = QLabel("")
+        self.hash_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.hash_status_label)
+
+        self.metadata_status_label = QLabel("")
+        self.metadata_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.metadata_status_label)
+
+        self.cancel_hash_button = QPushButton("Cancel")
+        self.cancel_hash_button.setEnabled(False)
+        self.cancel_hash_button.clicked.connect(self.cancel_hashing)
+        layout.addWidget(self.cancel_hash_button)
 
         self.calculate_hashes_dialog.show()
 
@@ -813,309 +1025,285 @@ class XMLGeneratorApp(QMainWindow):
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
             if file_path.endswith('.xci'):
-                if self.is_full_xci(file_path):
+                try:
+                    full_xci = is_full_xci(file_path)
+                except InvalidXCIError:
+                    QMessageBox.critical(self, "Invalid XCI", "No valid XCI header was found in this file")
+                    return
+                if full_xci:
                     QMessageBox.critical(self, "Invalid XCI", "This is a FullXCI, please drag and drop a Default XCI")
                     return
                 else:
                     self.default_xci_path = file_path
                     self.process_file(file_path)
-                    if platform.system() == "Windows":
-                        self.calculate_hashes_dialog.close()
-                    self.calculate_full_xci_hashes()
                     break
 
-    def is_full_xci(self, file_path):
-        with open(file_path, 'rb') as file:
-            file.seek(0x1A0)
-            data_segment = file.read(96)
+    def calculate_full_xci_hashes(self):
+        if not self.default_xci_path or self.is_hashing():
+            return
 
-        is_full_xci = all(b == 0 for b in data_segment)
+        if not self.calculate_hashes_dialog or not self.calculate_hashes_dialog.isVisible():
+            self.prompt_for_default_xci()
 
-        return is_full_xci
+        include_full_xci = not self.scene_release_checkbox.isChecked() and self.include_initial_area_checkbox.isChecked()
+        initial_area_path = self.initial_area_path if include_full_xci else None
 
-    def calculate_full_xci_hashes(self):
-        if self.scene_release_checkbox.isChecked():
-            if self.default_xci_path:
-                with open(self.default_xci_path, 'rb') as default_xci_file:
-                    total_size = os.path.getsize(self.default_xci_path)
-                    processed_size = 0
-
-                    crc32 = 0
-                    hasher_md5 = hashlib.md5()
-                    hasher_sha1 = hashlib.sha1()
-                    hasher_sha256 = hashlib.sha256()
-
-                    while chunk := default_xci_file.read(4194304):
-                        processed_size += len(chunk)
-                        crc32 = zlib.crc32(chunk, crc32)
-                        hasher_md5.update(chunk)
-                        hasher_sha1.update(chunk)
-                        hasher_sha256.update(chunk)
-
-                        progress = (processed_size / total_size) * 100
-                        sys.stdout.write(f"\rCalculating hashes for XCI... {progress:.0f}%")
-                        sys.stdout.flush()
-
-                    print("\nCompleted hash calculation for XCI")
-
-                    crc32 = format(crc32 & 0xFFFFFFFF, '08x')
-                    md5 = hasher_md5.hexdigest()
-                    sha1 = hasher_sha1.hexdigest()
-                    sha256 = hasher_sha256.hexdigest()
-
-                    self.file_inputs["File Size 1"].setText(str(total_size))
-                    self.file_inputs["CRC32 1"].setText(crc32)
-                    self.file_inputs["MD5 1"].setText(md5)
-                    self.file_inputs["SHA1 1"].setText(sha1)
-                    self.file_inputs["SHA256 1"].setText(sha256)
+        self.start_hash_worker(HashWorker(
+            self.default_xci_path, initial_area_path, self.hash_cache,
+            self.verify_hashes_checkbox.isChecked(), self.untrim_hashes_checkbox.isChecked(),
+            self.hash_backend_combo.currentText(), self.cache_mode_combo.currentText(), self.queue_depth_spinbox.value(), self
+        ))
+
+        if self.import_metadata_while_hashing_checkbox.isChecked():
+            self.start_metadata_worker(self.default_xci_path)
 
+    def start_metadata_worker(self, xci_path):
+        if self.metadata_worker is not None and self.metadata_worker.isRunning():
             return
 
-        if self.initial_area_path and self.default_xci_path:
-            total_size = os.path.getsize(self.initial_area_path) + 3584 + os.path.getsize(self.default_xci_path)
-            processed_size = 0
-
-            crc32 = 0
-            hasher_md5 = hashlib.md5()
-            hasher_sha1 = hashlib.sha1()
-            hasher_sha256 = hashlib.sha256()
-
-            with open(self.initial_area_path, 'rb') as initial_area_file:
-                while chunk := initial_area_file.read(4194304):
-                    processed_size += len(chunk)
-                    crc32 = zlib.crc32(chunk, crc32)
-                    hasher_md5.update(chunk)
-                    hasher_sha1.update(chunk)
-                    hasher_sha256.update(chunk)
-
-                    progress = (processed_size / total_size) * 100
-                    sys.stdout.write(f"\rProcessing Initial Area... {progress:.0f}%")
-                    sys.stdout.flush()
-
-            zeroes_data = b'\x00' * 3584
-            crc32 = zlib.crc32(zeroes_data, crc32)
-            hasher_md5.update(zeroes_data)
-            hasher_sha1.update(zeroes_data)
-            hasher_sha256.update(zeroes_data)
-            processed_size += 3584
-            progress = (processed_size / total_size) * 100
-            sys.stdout.write(f"\rProcessing Zero Padding... {progress:.0f}%")
-            sys.stdout.flush()
-
-            with open(self.default_xci_path, 'rb') as default_xci_file:
-                while chunk := default_xci_file.read(4194304):
-                    processed_size += len(chunk)
-                    crc32 = zlib.crc32(chunk, crc32)
-                    hasher_md5.update(chunk)
-                    hasher_sha1.update(chunk)
-                    hasher_sha256.update(chunk)
-
-                    progress = (processed_size / total_size) * 100
-                    sys.stdout.write(f"\rProcessing XCI... {progress:.0f}%")
-                    sys.stdout.flush()
-
-            print("\nCompleted hash calculation for XCI")
-
-            size = str(total_size)
-            crc32 = format(crc32 & 0xFFFFFFFF, '08x')
-            md5 = hasher_md5.hexdigest()
-            sha1 = hasher_sha1.hexdigest()
-            sha256 = hasher_sha256.hexdigest()
-
-            self.file_inputs["File Size 3"].setText(size)
-            self.file_inputs["CRC32 3"].setText(crc32)
-            self.file_inputs["MD5 3"].setText(md5)
-            self.file_inputs["SHA1 3"].setText(sha1)
-            self.file_inputs["SHA256 3"].setText(sha256)
+        hactoolnet_path, prod_keys_path = find_hactoolnet()
+        if not os.path.exists(prod_keys_path):
+            self.metadata_status_label.setText("prod.keys not found, skipping metadata import")
+            return
+
+        self.metadata_status_label.setText("Importing metadata...")
+        self.metadata_worker = MetadataWorker(xci_path, hactoolnet_path, prod_keys_path, self.metadata_cache, self)
+        self.metadata_worker.titles_ready.connect(self.metadata_ready)
+        self.metadata_worker.failed.connect(self.metadata_failed)
+        self.metadata_worker.start()
+
+    def metadata_ready(self, titles):
+        fields = metadata_fields(titles)
+        if not fields:
+            self.metadata_status_label.setText("No titles were found, use Manually Import Metadata instead")
+            return
+
+        self.fill_metadata(fields)
+        self.metadata_status_label.setText(f"Imported metadata for {fields.get('Game Name', 'unknown title')}")
+
+    def fill_metadata(self, fields):
+        for label in ('Game Name', 'Languages', 'GameID1'):
+            if label in fields:
+                self.basic_info_inputs[label].setText(fields[label])
+        for label in ('Version', 'Update'):
+            if label in fields:
+                self.file_inputs[f"{label} 1"].setText(fields[label])
 
         self.update_display()
 
+    def metadata_failed(self, error):
+        self.metadata_status_label.setText("Metadata import failed")
+        QMessageBox.critical(self, "Metadata Import Failed", f"Metadata import failed with error: {error}")
 
-    def update_mediastamp(self):
-        media_serial2 = self.serial_details_inputs['Media Serial 2'].text()
-        mediastamp = media_serial2[-3:] if len(media_serial2) >= 3 else ""
-        self.serial_details_inputs['Mediastamp'] = mediastamp
+    def hash_scene_rar(self):
+        if self.is_hashing():
+            QMessageBox.warning(self, "Hashing In Progress", "Please wait for the current hash calculation to finish or cancel it first")
+            return
+
+        rar_file = self.find_scene_rar()
+        if not rar_file:
+            return
+        ok, password = self.scene_rar_password(rar_file)
+        if not ok:
+            return
+
+        extract_dir = self.scene_dir if self.extract_while_hashing_checkbox.isChecked() else None
+        if extract_dir:
+            try:
+                extract_path = rar_extract_path(rar_file, password, extract_dir)
+            except (rarfile.Error, OSError):
+                extract_path = None
+            if extract_path and os.path.exists(extract_path):
+                reply = QMessageBox.question(
+                    self, "XCI Already Extracted",
+                    f"{os.path.basename(extract_path)} already exists in the scene directory and won't be overwritten\n\nHash the RARs without extracting?"
+                )
+                if reply != QMessageBox.StandardButton.Yes:
+                    return
+                extract_dir = None
+
+        if not self.calculate_hashes_dialog or not self.calculate_hashes_dialog.isVisible():
+            self.prompt_for_default_xci()
+        self.calculate_hashes_label.setText(f"Hashing the XCI straight from the scene RARs{' and extracting it' if extract_dir else ''}, the CRC32 stored in the RAR is verified in the same pass\n\n{os.path.basename(rar_file)}")
+
+        self.start_hash_worker(RarHashWorker(rar_file, password, extract_dir, self))
+
+    def start_hash_worker(self, worker):
+        self.hash_started_at = time.monotonic()
+        self.hash_progress_bar.setValue(0)
+        self.hash_status_label.setText("Starting hash calculation...")
+        self.cancel_hash_button.setEnabled(True)
+        self.calculate_hashes_dialog.setAcceptDrops(False)
+
+        self.hash_worker = worker
+        self.hash_worker.progress.connect(self.update_hash_progress)
+        self.hash_worker.hashes_ready.connect(self.hashes_ready)
+        self.hash_worker.failed.connect(self.hashing_failed)
+        self.hash_worker.cancelled.connect(self.hashing_cancelled)
+        self.hash_worker.start()
+
+    def update_hash_progress(self, processed_size, total_size):
+        elapsed = time.monotonic() - self.hash_started_at
+        self.hash_progress_bar.setValue(int(processed_size * 1000 / total_size) if total_size else 1000)
+
+        if elapsed > 0 and processed_size:
+            rate = processed_size / elapsed
+            eta = int((total_size - processed_size) / rate)
+            self.hash_status_label.setText(f"{processed_size / 1048576:.0f} / {total_size / 1048576:.0f} MB at {rate / 1048576:.1f} MB/s, ETA {eta // 60}:{eta % 60:02d}")
+
+    def hashes_ready(self, default_results, full_xci_results, timings):
+        self.fill_file_inputs(1, default_results)
+        if full_xci_results:
+            self.fill_file_inputs(3, full_xci_results)
+
+        elapsed = time.monotonic() - self.hash_started_at
+        self.hash_progress_bar.setValue(1000)
+        if timings:
+            slowest_digest = max(timings, key=timings.get)
+            self.hash_status_label.setText(f"Completed in {elapsed:.1f} seconds\n\nSlowest digest: {slowest_digest} ({timings[slowest_digest]:.1f} seconds)")
+        else:
+            self.hash_status_label.setText("Loaded cached hashes, check Verify Anyway on the File Info tab to re-hash")
+        self.finish_hashing()
+
+        if platform.system() == "Windows":
+            self.calculate_hashes_dialog.close()
+
+    def hashing_failed(self, error):
+        self.hash_status_label.setText("Hash calculation failed")
+        self.finish_hashing()
+        QMessageBox.critical(self, "Hashing Failed", f"Hash calculation failed with error: {error}")
+
+    def hashing_cancelled(self):
+        self.hash_progress_bar.setValue(0)
+        self.hash_status_label.setText("Hash calculation cancelled")
+        self.finish_hashing()
+
+    def is_hashing(self):
+        return self.hash_worker is not None and self.hash_worker.isRunning()
+
+    def cancel_hashing(self):
+        if self.is_hashing():
+            self.cancel_hash_button.setEnabled(False)
+            self.hash_status_label.setText("Cancelling...")
+            self.hash_worker.requestInterruption()
+
+    def finish_hashing(self):
+        self.cancel_hash_button.setEnabled(False)
+        self.calculate_hashes_dialog.setAcceptDrops(True)
+        self.update_hash_cache_label()
         self.update_display()
 
-    def update_game_id2(self):
-        media_serial1 = self.serial_details_inputs['Media Serial 1'].text()
-        if media_serial1.endswith('1'):
-            self.gameid2 = media_serial1[:-5] if len(media_serial1) > 5 else media_serial1
+    def save_read_method(self):
+        self.queue_depth_spinbox.setEnabled(self.hash_backend_combo.currentText() == "prefetch")
+        self.settings.setValue("hashBackend", self.hash_backend_combo.currentText())
+        self.settings.setValue("queueDepth", self.queue_depth_spinbox.value())
+        self.settings.setValue("cacheMode", self.cache_mode_combo.currentText())
+
+    def update_hash_cache_label(self):
+        self.hash_cache_label.setText(f"Hash cache: {self.hash_cache.hits} hits, {self.hash_cache.misses} misses")
+
+    def clear_hash_cache(self):
+        self.hash_cache.clear()
+        QMessageBox.information(self, "Hash Cache Cleared", "All cached hashes have been removed")
+
+    def verify_xci_integrity(self):
+        xci_path, _ = QFileDialog.getOpenFileName(self, "Select an XCI to verify", os.path.dirname(self.default_xci_path or ""), "XCI files (*.xci)")
+        if not xci_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            entries, failures = verify_xci_integrity(xci_path)
+        except (InvalidXCIError, OSError) as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "Invalid XCI", f"Could not read the partitions of this XCI: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+
+        if failures:
+            details = "\n".join(str(failure) for failure in failures)
+            QMessageBox.critical(self, "Integrity Check Failed", f"{len(failures)} of {len(entries)} entries failed:\n\n{details}")
         else:
-            self.gameid2 = media_serial1[:-4] if len(media_serial1) > 4 else media_serial1
+            QMessageBox.information(self, "Integrity Check Passed", f"All {len(entries)} partition and file hashes match")
+
+    def update_mediastamp(self):
+        self.serial_details_inputs['Mediastamp'] = mediastamp_from_serial(self.serial_details_inputs['Media Serial 2'].text())
         self.update_display()
 
-    def generate_xml(self):
-        datafile = ET.Element('datafile')
-        game = ET.SubElement(datafile, 'game', name=self.basic_info_inputs['Game Name'].text() or "")
+    def update_game_id2(self):
+        self.gameid2 = game_id2_from_serial(self.serial_details_inputs['Media Serial 1'].text())
+        self.update_display()
 
+    def collect_submission(self):
         region = self.custom_region_input.text() if self.custom_region_checkbox.isChecked() else self.region_values.get(self.region_combo_box.currentText(), "")
+        dump_date = self.custom_dump_date_input.date().toString("yyyy-MM-dd") if self.custom_dump_date_checkbox.isChecked() else QDate.currentDate().toString("yyyy-MM-dd")
+
+        files = {}
+        for index in (1, 2, 3):
+            files[index] = {
+                label: self.file_inputs[f"{label} {index}"].text() or ""
+                for label in ("File Size", "CRC32", "MD5", "SHA1", "SHA256", "Version", "Update")
+                if f"{label} {index}" in self.file_inputs
+            }
 
-        archive_attrs = {
-            "clone": "P",
-            "name": self.basic_info_inputs['Game Name'].text() or "",
+        submission = {
+            "game_name": self.basic_info_inputs['Game Name'].text() or "",
             "region": region or "",
             "languages": self.basic_info_inputs['Languages'].text() or "",
-            "langchecked": "unk",
             "gameid1": self.basic_info_inputs['GameID1'].text() or "",
             "gameid2": self.gameid2 or "",
-            "categories": "Games"
+            "mediastamp": self.serial_details_inputs.get('Mediastamp', '') or "",
+            "media_serial1": self.serial_details_inputs['Media Serial 1'].text() or "",
+            "media_serial2": self.serial_details_inputs['Media Serial 2'].text() or "",
+            "pcb_serial": self.serial_details_inputs['PCB Serial'].currentText() or "",
+            "box_serial": (self.serial_details_inputs['Box Serial'].text() or "") if self.serial_details_inputs['Box Serial'].isEnabled() else None,
+            "box_barcode": (self.serial_details_inputs['Box Barcode'].text() or "") if self.serial_details_inputs['Box Barcode'].isEnabled() else None,
+            "dump_date": dump_date or "",
+            "dumper": self.source_details_inputs['Dumper'].text() or "",
+            "tool": self.source_details_inputs['Tool'].currentText() or "",
+            "comment1": self.source_details_inputs['Comment1'].toPlainText(),
+            "include_initial_area": self.include_initial_area_checkbox.isChecked(),
+            "files": files
         }
 
-        mediastamp = self.serial_details_inputs.get('Mediastamp', '') or ""
-        if mediastamp and re.match(r'^[a-f0-9]{3}$', mediastamp, re.IGNORECASE):
-            rev_value = int(mediastamp, 16)
-            if rev_value != 0:
-                archive_attrs["version1"] = f"Rev {rev_value}"
-
-        archive = ET.SubElement(game, 'archive', **archive_attrs)
-
         if self.scene_release_checkbox.isChecked():
-            release = ET.SubElement(game, 'release')
-
             nfoname_base = os.path.splitext(self.scene_nfoname or "")[0]
             archivename_base = os.path.splitext(self.scene_archivename or nfoname_base)[0]
 
             date = self.scene_date or time.strftime('%Y-%m-%d', time.gmtime(os.path.getmtime(os.path.join(self.scene_dirname, self.scene_nfoname))))
 
-            dirname_base = os.path.basename(self.scene_dirname or "")
-
-            details = ET.SubElement(release, 'details')
-            details.set("dirname", dirname_base or "")
-            details.set("nfoname", nfoname_base or "")
-            details.set("archivename", archivename_base or "")
-            details.set("region", region or "")
-            details.set("nfosize", self.scene_nfosize or "")
-            details.set("nfocrc", self.scene_nfocrc or "")
-            details.set("date", date or "")
-            details.set("group", self.custom_scene_group_input.text() if self.custom_scene_group_input.text() else self.scene_group_dropdown.currentText() or "")
-
-            serials_attrs = {
-                "media_serial1": self.serial_details_inputs['Media Serial 1'].text() or "",
-                "media_serial2": self.serial_details_inputs['Media Serial 2'].text().strip() or "",
-                "mediastamp": mediastamp,
-                "pcb_serial": self.serial_details_inputs['PCB Serial'].currentText() or ""
+            submission["scene"] = {
+                "dirname": os.path.basename(self.scene_dirname or "") or "",
+                "nfoname": nfoname_base or "",
+                "archivename": archivename_base or "",
+                "nfosize": self.scene_nfosize or "",
+                "nfocrc": self.scene_nfocrc or "",
+                "date": date or "",
+                "group": self.custom_scene_group_input.text() if self.custom_scene_group_input.text() else self.scene_group_dropdown.currentText() or ""
             }
 
-            if self.serial_details_inputs['Box Serial'].isEnabled():
-                serials_attrs["box_serial"] = self.serial_details_inputs['Box Serial'].text() or ""
-
-            if self.serial_details_inputs['Box Barcode'].isEnabled():
-                serials_attrs["box_barcode"] = self.serial_details_inputs['Box Barcode'].text() or ""
-
-            serials = ET.SubElement(release, 'serials', **serials_attrs)
-
-            file1 = ET.SubElement(release, 'file',
-                forcename="",
-                size=self.file_inputs['File Size 1'].text() or "",
-                crc32=self.file_inputs['CRC32 1'].text().lower() or "",
-                md5=self.file_inputs['MD5 1'].text() or "",
-                sha1=self.file_inputs['SHA1 1'].text() or "",
-                sha256=self.file_inputs['SHA256 1'].text() or "",
-                extension="xci",
-                version=self.file_inputs['Version 1'].text() or "",
-                update_type=self.file_inputs['Update 1'].text() or "",
-                format="Default"
-            )
-
-        else:
-            source = ET.SubElement(game, 'source')
-
-            dump_date = self.custom_dump_date_input.date().toString("yyyy-MM-dd") if self.custom_dump_date_checkbox.isChecked() else QDate.currentDate().toString("yyyy-MM-dd")
-
-            comment1_lines = self.source_details_inputs['Comment1'].toPlainText().strip().split('\n')
-            comment1 = "&#10;".join(comment1_lines[:4])
-
-            details = ET.SubElement(source, 'details',
-                section="Trusted Dump",
-                d_date=dump_date or "",
-                r_date="",
-                r_date_info="0",
-                region=region or "",
-                dumper=self.source_details_inputs['Dumper'].text() or "",
-                project="No-Intro",
-                tool=self.source_details_inputs['Tool'].currentText() or "",
-                comment1=comment1 or "",
-                originalformat="Default",
-            )
-
-            serials_attrs = {
-                "media_serial1": self.serial_details_inputs['Media Serial 1'].text() or "",
-                "media_serial2": self.serial_details_inputs['Media Serial 2'].text().strip() or "",
-                "mediastamp": mediastamp,
-                "pcb_serial": self.serial_details_inputs['PCB Serial'].currentText() or ""
-            }
-
-            if self.serial_details_inputs['Box Serial'].isEnabled():
-                serials_attrs["box_serial"] = self.serial_details_inputs['Box Serial'].text() or ""
-
-            if self.serial_details_inputs['Box Barcode'].isEnabled():
-                serials_attrs["box_barcode"] = self.serial_details_inputs['Box Barcode'].text() or ""
-
-            serials = ET.SubElement(source, 'serials', **serials_attrs)
-
-            file1 = ET.SubElement(release if self.scene_release_checkbox.isChecked() else source, 'file',
-                forcename="",
-                size=self.file_inputs['File Size 1'].text() or "",
-                crc32=self.file_inputs['CRC32 1'].text().lower() or "",
-                md5=self.file_inputs['MD5 1'].text() or "",
-                sha1=self.file_inputs['SHA1 1'].text() or "",
-                sha256=self.file_inputs['SHA256 1'].text() or "",
-                extension="xci",
-                version=self.file_inputs['Version 1'].text() or "",
-                update_type=self.file_inputs['Update 1'].text() or "",
-                format="Default"
-            )
-
-            if self.include_initial_area_checkbox.isChecked():
-                file2 = ET.SubElement(source, 'file',
-                    forcename="",
-                    size=self.file_inputs['File Size 2'].text() or "",
-                    crc32=self.file_inputs['CRC32 2'].text().lower() or "",
-                    md5=self.file_inputs['MD5 2'].text() or "",
-                    sha1=self.file_inputs['SHA1 2'].text() or "",
-                    sha256=self.file_inputs['SHA256 2'].text() or "",
-                    extension="bin",
-                    item="Initial Area",
-                    format="Default",
-                    filter="Initial Area"
-                )
-
-                file3 = ET.SubElement(source, 'file',
-                    forcename="",
-                    size=self.file_inputs['File Size 3'].text() or "",
-                    crc32=self.file_inputs['CRC32 3'].text().lower() or "",
-                    md5=self.file_inputs['MD5 3'].text() or "",
-                    sha1=self.file_inputs['SHA1 3'].text() or "",
-                    sha256=self.file_inputs['SHA256 3'].text() or "",
-                    extension="xci",
-                    format="FullXCI"
-                )
+        return submission
 
-
-        xml_str = minidom.parseString(ET.tostring(datafile, encoding="utf-8")).toprettyxml(indent="    ")
+    def generate_xml(self):
+        submission = self.collect_submission()
+        xml_str = build_submission_xml(submission)
 
         output_dir = QFileDialog.getExistingDirectory(self, "Select Output Directory")
         if output_dir:
-            game_name = self.basic_info_inputs['Game Name'].text() or ""
-            dumper = self.source_details_inputs['Dumper'].text() or ""
-            dump_date = self.custom_dump_date_input.date().toString("yyyy-MM-dd") if self.custom_dump_date_checkbox.isChecked() else QDate.currentDate().toString("yyyy-MM-dd")
-            file_name = f"{game_name} - {dumper} - {dump_date} Submission.xml"
+            file_name = submission_file_name(submission['game_name'], submission['dumper'], submission['dump_date'])
             file_path = os.path.join(output_dir, file_name)
             with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(self.transform_xml(xml_str))
+                file.write(xml_str)
 
             self.open_output_directory(output_dir)
 
-
-    def transform_xml(self, xml_str):
-        return xml_str.replace("&amp;#10;", "&#10;")
-
     def open_generate_card_id_dialog(self):
         dialog = GenerateCardIDDialog(self)
         dialog.exec()
 
     def reset_all_fields(self):
+        self.cancel_hashing()
+
         for input in self.basic_info_inputs.values():
             if isinstance(input, QLineEdit):
                 input.clear()
@@ -1150,6 +1338,17 @@ class XMLGeneratorApp(QMainWindow):
         self.update_display()
 
 
+    def closeEvent(self, event):
+        if self.is_hashing():
+            self.hash_worker.requestInterruption()
+            self.hash_worker.wait()
+        if self.sfv_worker is not None and self.sfv_worker.isRunning():
+            self.sfv_worker.requestInterruption()
+            self.sfv_worker.wait()
+        if self.metadata_worker is not None and self.metadata_worker.isRunning():
+            self.metadata_worker.wait()
+        super().closeEvent(event)
+
     def set_preferred(self):
         dumper = self.source_details_inputs["Dumper"].text()
         tool = self.source_details_inputs["Tool"].currentText()
@@ -1170,6 +1369,35 @@ class XMLGeneratorApp(QMainWindow):
 
     def select_directory(self):
         directory = QFileDialog.getExistingDirectory(self, "Select Scene Directory")
+        self.open_scene_directory(directory)
+
+    def index_scene_library(self):
+        root = QFileDialog.getExistingDirectory(self, "Select Scene Library")
+        if not root:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            counts = self.scene_index.scan(root)
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        QMessageBox.information(
+            self, "Scene Library Indexed",
+            f"{counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged, {counts['removed']} removed"
+        )
+
+    def pick_scene_release(self):
+        releases = [release['dirname'] for release in self.scene_index.releases()]
+        if not releases:
+            QMessageBox.information(self, "Scene Library Empty", "No releases have been indexed yet, use Index Scene Library first")
+            return
+
+        directory, ok = QInputDialog.getItem(self, "Pick Release", "Release:", releases, 0, True)
+        if ok and directory in releases:
+            self.open_scene_directory(directory)
+
+    def open_scene_directory(self, directory):
         if directory:
             self.scene_dir = directory
             self.scene_directory_label.setWordWrap(True)
@@ -1179,32 +1407,28 @@ class XMLGeneratorApp(QMainWindow):
 
             self.nfo_viewer_button.setEnabled(True)
             self.verify_rars_button.setEnabled(True)
+            self.stop_on_mismatch_checkbox.setEnabled(True)
             self.scene_group_dropdown.setEnabled(True)
             self.custom_scene_group_input.setEnabled(True)
             self.extract_button.setEnabled(True)
             self.keep_scene_rar_checkbox.setEnabled(True)
+            self.hash_rar_button.setEnabled(True)
+            self.extract_while_hashing_checkbox.setEnabled(True)
 
         else:
             if self.scene_release_checkbox.isChecked():
                 self.generate_button.setEnabled(False)
 
     def extract_scene_info(self, directory):
-        self.scene_dirname = directory
-        self.scene_archivename = None
-        self.scene_nfoname = None
-        self.scene_nfosize = None
-        self.scene_nfocrc = None
-        self.scene_date = None
+        release = self.scene_index.refresh(directory) or {}
 
-        for file in os.listdir(directory):
-            if file.endswith(".rar"):
-                self.scene_archivename = file
-                self.scene_date = time.strftime('%Y-%m-%d', time.gmtime(os.path.getmtime(os.path.join(directory, file))))
-                self.scene_sfvname = file.replace(".rar", ".sfv")
-            elif file.endswith(".nfo"):
-                self.scene_nfoname = file
-                self.scene_nfosize = str(os.path.getsize(os.path.join(directory, file)))
-                self.scene_nfocrc = self.calculate_crc32(os.path.join(directory, file))
+        self.scene_dirname = directory
+        self.scene_archivename = release.get('archivename')
+        self.scene_sfvname = release.get('sfvname')
+        self.scene_nfoname = release.get('nfoname')
+        self.scene_nfosize = release.get('nfosize')
+        self.scene_nfocrc = release.get('nfocrc')
+        self.scene_date = release.get('date')
         self.update_display()
 
     def open_nfo_viewer(self):
@@ -1232,58 +1456,70 @@ class XMLGeneratorApp(QMainWindow):
         if not os.path.exists(sfv_path):
             QMessageBox.warning(self, "Missing SFV File", "No SFV file detected in the directory")
             return
+        if self.sfv_worker is not None and self.sfv_worker.isRunning():
+            self.sfv_dialog.raise_()
+            return
 
-        log = []
-        mismatches = []
-        all_matched = True
+        self.sfv_dialog = QDialog(self)
+        self.sfv_dialog.setWindowTitle("Verification Result")
+        self.sfv_dialog.resize(400, 600)
+        layout = QVBoxLayout(self.sfv_dialog)
+        self.sfv_log = QTextEdit()
+        self.sfv_log.setReadOnly(True)
+        layout.addWidget(self.sfv_log)
+        self.sfv_dialog.setLayout(layout)
+        self.sfv_dialog.finished.connect(self.stop_sfv_verification)
+        self.sfv_dialog.show()
+
+        self.sfv_worker = SfvVerifyWorker(sfv_path, self.stop_on_mismatch_checkbox.isChecked(), self)
+        self.sfv_worker.result.connect(self.sfv_result)
+        self.sfv_worker.verified.connect(self.sfv_verified)
+        self.sfv_worker.failed.connect(self.sfv_failed)
+        self.sfv_worker.start()
+
+    def sfv_result(self, result):
+        for line in sfv_result_lines(result):
+            self.sfv_log.append(line)
+
+    def sfv_verified(self, results, elapsed):
+        failures = [result for result in results if result.failed]
+        if failures:
+            self.sfv_log.append("\nMismatched CRCs were found:")
+            for result in failures:
+                self.sfv_log.append(f"- {result.file_name}")
+        else:
+            self.sfv_log.append("\nAll CRCs matched successfully")
+        self.sfv_log.append(f"\n{sfv_summary(results, elapsed)}")
 
-        try:
-            with open(sfv_path, 'r') as sfv_file:
-                sfv_lines = sfv_file.readlines()
-
-                for line in sfv_lines:
-                    if line.strip() and not line.startswith(';'):
-                        file_name, expected_crc32 = line.rsplit(' ', 1)
-                        file_path = os.path.join(self.scene_dirname, file_name)
-                        if not os.path.exists(file_path):
-                            log.append(f"File {file_name} not found.")
-                            all_matched = False
-                            continue
-
-                        actual_crc32 = self.calculate_crc32(file_path).strip().upper()
-                        expected_crc32 = expected_crc32.strip().upper()
-
-                        log.append(f"Checking {file_name}: Expected [{expected_crc32}] vs Actual [{actual_crc32}]")
-
-                        if actual_crc32 != expected_crc32:
-                            log.append(f"CRC mismatch for {file_name}")
-                            mismatches.append(file_name)
-                            all_matched = False
-                        else:
-                            log.append(f"{file_name}: CRC matches")
-
-            if all_matched:
-                log.append("\nAll CRCs matched successfully")
-            else:
-                log.append("\nMismatched CRCs were found:")
-                for mismatch in mismatches:
-                    log.append(f"- {mismatch}")
-
-            log_text = "\n".join(log)
-
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Verification Result")
-            dialog.resize(400, 600)
-            layout = QVBoxLayout(dialog)
-            text_edit = QTextEdit()
-            text_edit.setReadOnly(True)
-            text_edit.setPlainText(log_text)
-            layout.addWidget(text_edit)
-            dialog.setLayout(layout)
-            dialog.exec()
+    def sfv_failed(self, error):
+        QMessageBox.critical(self, "Verification Failed", f"Verification failed with error: {error}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Verification Failed", f"Verification failed with error: {str(e)}")
+    def stop_sfv_verification(self):
+        if self.sfv_worker is not None and self.sfv_worker.isRunning():
+            self.sfv_worker.requestInterruption()
+
+    def find_scene_rar(self):
+        if not self.scene_dir:
+            QMessageBox.warning(self, "No Directory Selected", "Please select a directory first.")
+            return None
+
+        for file in os.listdir(self.scene_dir):
+            if file.endswith(".rar"):
+                return os.path.join(self.scene_dir, file)
+
+        QMessageBox.warning(self, "RAR File Not Found", "No .rar file detected in the selected directory.")
+        return None
+
+    def scene_rar_password(self, rar_file):
+        with rarfile.RarFile(rar_file) as rf:
+            if not rf.needs_password():
+                return True, None
+
+        password, ok = QInputDialog.getText(self, "Password Required", "Enter the password for the RAR file:", QLineEdit.Password)
+        if not ok or not password:
+            QMessageBox.warning(self, "Password Missing", "Password is required to extract the RAR file.")
+            return False, None
+        return True, password
 
     def extract_rar(self):
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1293,34 +1529,16 @@ class XMLGeneratorApp(QMainWindow):
             QMessageBox.critical(self, "Unrar Missing", "The unrar utility is not found in the same directory as the script\n\nPlease ensure unrar is present before continuing")
             return
 
-        if not self.scene_dir:
-            QMessageBox.warning(self, "No Directory Selected", "Please select a directory first.")
-            return
-
-        rar_file = None
-        for file in os.listdir(self.scene_dir):
-            if file.endswith(".rar"):
-                rar_file = os.path.join(self.scene_dir, file)
-                break
-
+        rar_file = self.find_scene_rar()
         if not rar_file:
-            QMessageBox.warning(self, "RAR File Not Found", "No .rar file detected in the selected directory.")
             return
-
-        password = None
-        rarfile_is_encrypted = False
-
-        with rarfile.RarFile(rar_file) as rf:
-            if rf.needs_password():
-                rarfile_is_encrypted = True
-                password, ok = QInputDialog.getText(self, "Password Required", "Enter the password for the RAR file:", QLineEdit.Password)
-                if not ok or not password:
-                    QMessageBox.warning(self, "Password Missing", "Password is required to extract the RAR file.")
-                    return
+        ok, password = self.scene_rar_password(rar_file)
+        if not ok:
+            return
 
         try:
             with rarfile.RarFile(rar_file) as rf:
-                rf.extractall(path=self.scene_dir, pwd=password if rarfile_is_encrypted else None)
+                rf.extractall(path=self.scene_dir, pwd=password)
             QMessageBox.information(self, "Extraction Complete", "All RARs have been successfully extracted")
 
             keep_rar = self.keep_scene_rar_checkbox.isChecked()
@@ -1351,9 +1569,8 @@ class ImportNXGameInfoDialog(QDialog):
 
         self.drag_drop_label = QLabel(
             "Drag and drop an XCI here to automatically import metadata from the embedded Control NACP\n\n"
-            "Note: hactoolnet (with associated libraries) must be in the same directory as the script\n\n"
-            "Up-to-date prod.keys must also be in the same directory\n\n"
-            ".NET must be installed on your system for the hactoolnet executable to parse metadata"
+            "Note: up-to-date prod.keys must be in the same directory as the script\n\n"
+            "hactoolnet (with associated libraries and .NET) is only used as a fallback for carts the built-in reader can't parse"
         )
         self.drag_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.drag_drop_label)
@@ -1361,14 +1578,7 @@ class ImportNXGameInfoDialog(QDialog):
         self.setLayout(layout)
         self.setAcceptDrops(True)
 
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-
-        if platform.system() == "Windows":
-            self.hactoolnet_path = os.path.join(script_dir, "hactoolnet.exe")
-        else:
-            self.hactoolnet_path = os.path.join(script_dir, "hactoolnet")
-
-        self.prod_keys_path = os.path.join(script_dir, "prod.keys")
+        self.hactoolnet_path, self.prod_keys_path = find_hactoolnet()
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -1383,114 +1593,23 @@ class ImportNXGameInfoDialog(QDialog):
             else:
                 QMessageBox.warning(self, "Error", "Please drop a valid XCI file.")
         else:
-            QMessageBox.warning(self, "Error", "Please drop only one file.")
+            xci_files = [url.toLocalFile() for url in urls if url.toLocalFile().endswith(".xci")]
+            if not xci_files:
+                QMessageBox.warning(self, "Error", "Please drop valid XCI files.")
+                return
+            dialog = BatchMetadataDialog(xci_files, self.hactoolnet_path, self.prod_keys_path, self.parent())
+            dialog.exec()
 
     def process_xci(self, xci_file):
-
-        command = [self.hactoolnet_path, "-k", self.prod_keys_path, "-t", "xci", "--disablekeywarns", "--listtitles", xci_file]
-
         try:
-            result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
-            output = result.stdout
-            base_title_ids, update_title_ids, updates, versions, titles, languages = self.parse_hactoolnet_output(output)
-            formatted_titles = [self.format_title(title) for title in titles]
+            titles = list_titles(xci_file, self.hactoolnet_path, self.prod_keys_path, self.parent().metadata_cache)
+            base_title_ids, update_title_ids, updates, versions, titles, languages = titles
+            formatted_titles = [format_title(title) for title in titles]
 
             self.display_results(base_title_ids, update_title_ids, updates, versions, formatted_titles, languages)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
 
-    def is_full_xci(self, file_path):
-        with open(file_path, 'rb') as file:
-            file.seek(0x1A0)
-            data_segment = file.read(96)
-
-        is_full_xci = all(b == 0 for b in data_segment)
-
-        return is_full_xci
-
-    def parse_hactoolnet_output(self, output):
-        language_set = set()
-        language_dict = {
-            "en-US": "En", "en-GB": "En", "ja": "Ja", "fr": "Fr", "de": "De",
-            "es-419": "Es", "es": "Es", "it": "It", "nl": "Nl", "fr-CA": "Fr",
-            "pt": "Pt", "ru": "Ru", "ko": "Ko", "zh-TW": "Zh-Hant", "zh-CN": "Zh-Hans"
-        }
-
-        base_titles, update_titles = {}, {}
-
-        base_title_ids, update_title_ids, updates, versions, titles = [], [], [], [], []
-
-        hactool_title_regex = re.compile(r'^(?P<title_id>[a-f0-9]{16})\s+(?P<version>v\d+)\s+(?:\d+\.){3}\d+\s+(?P<type>Application|Patch)\s+\d+(?:\.\d+)?\s+[a-z]{2}\s+(?P<display_version>[^\s]+)\s+(?P<name>.+?)\s+(?P<languages>[\w-]+(?:,[\w-]+)*)$', flags=(re.MULTILINE | re.IGNORECASE))
-
-        for match in re.finditer(hactool_title_regex, output):
-            title_id = match.group('title_id')
-            title_version = match.group('version')
-            title_type = match.group('type')
-            display_version = match.group('display_version')
-            title_name = match.group('name')
-            title_languages = match.group('languages').split(',')
-
-            detected_languages = [lang for lang in language_dict if lang in title_languages]
-            for lang in detected_languages:
-                language_set.add(language_dict[lang])
-
-            entry = {
-                'version': title_version,
-                'display_version': display_version,
-                'name': title_name,
-            }
-
-            if title_type == 'Application':
-                base_titles.update({ title_id.upper(): entry })
-            else:
-                update_titles.update({ title_id.upper(): entry })
-
-        for title_id, base_entry in base_titles.items():
-            base_title_ids.append(title_id)
-
-            update_tid_int = int(title_id, 16) | 0x800
-            update_tid = f'{update_tid_int:016X}'
-
-            update_entry = update_titles.get(update_tid, {})
-            if update_entry:
-                update_title_ids.append(update_tid)
-                updates.append(update_entry['version'])
-                versions.append("v" + update_entry['display_version'])
-                titles.append(update_entry['name'])
-            else:
-                updates.append(base_entry['version'])
-                versions.append("v" + base_entry['display_version'])
-                titles.append(base_entry['name'])
-
-        return base_title_ids, update_title_ids, updates, versions, titles, sorted(language_set)
-
-    def format_title(self, title):
-        title = title.replace(":", " - ").replace("~", "-")
-        title = re.sub(r'[\\/:*?"<>|`]', '', title)
-        title = re.sub(r'\s+', ' ', title).strip()
-
-        words = title.split()
-        articles = {"a", "an", "the"}
-        link_words = {"and", "or", "but", "nor", "so", "yet", "for", "at", "by", "in", "on", "to", "of", "up", "with", "as", "per"}
-
-        formatted_words = [
-            word.lower() if (word.lower() in articles or word.lower() in link_words) else
-            word if (word.isupper() or word.isalpha()) else word.capitalize()
-            for word in words
-        ]
-
-        if formatted_words[0].lower() in articles:
-            article = formatted_words.pop(0).capitalize()
-            try:
-                sep_index = formatted_words.index('-')
-                formatted_words[sep_index - 1] += ','
-                formatted_words.insert(sep_index, article)
-            except ValueError:
-                formatted_words[-1] += ','
-                formatted_words.append(article)
-
-        return ' '.join(formatted_words)
-
     def display_results(self, base_title_ids, update_title_ids, updates, versions, titles, languages):
 
         if titles:
@@ -1509,6 +1628,89 @@ class ImportNXGameInfoDialog(QDialog):
         if platform.system() == "Windows":
             self.accept()
 
+class BatchMetadataDialog(QDialog):
+    columns = (("XCI", "xci"), ("GameID1", "base_title_ids"), ("Game Name", "titles"), ("Version", "versions"), ("Update", "updates"), ("Languages", "languages"), ("Status", "error"))
+
+    def __init__(self, xci_paths, hactoolnet_path, prod_keys_path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import Metadata For Multiple XCIs")
+        self.setGeometry(100, 100, 900, 400)
+
+        layout = QVBoxLayout()
+
+        self.status_label = QLabel(f"Importing metadata for {len(xci_paths)} XCIs, {min(METADATA_JOBS, len(xci_paths))} at a time\n\nDouble-click a row to fill the form with it")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(len(xci_paths), len(self.columns))
+        self.table.setHorizontalHeaderLabels([label for label, _ in self.columns])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.cellDoubleClicked.connect(self.use_row)
+        for index, xci_path in enumerate(xci_paths):
+            self.table.setItem(index, 0, QTableWidgetItem(os.path.basename(xci_path)))
+            self.table.setItem(index, len(self.columns) - 1, QTableWidgetItem("Queued"))
+        layout.addWidget(self.table)
+
+        self.export_button = QPushButton("Export Titles")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_titles)
+        layout.addWidget(self.export_button)
+
+        self.setLayout(layout)
+
+        self.xci_paths = xci_paths
+        self.rows = {}
+        self.worker = MetadataBatchWorker(xci_paths, hactoolnet_path, prod_keys_path, parent.metadata_cache, self)
+        self.worker.result.connect(self.show_row)
+        self.worker.finished.connect(self.batch_finished)
+        self.worker.start()
+
+    def show_row(self, row):
+        index = self.xci_paths.index(row["xci"])
+        self.rows[index] = row
+        for column, (_, key) in enumerate(self.columns[1:], 1):
+            value = row[key]
+            if key == "error":
+                value = value or "OK"
+            elif key == "languages":
+                value = ','.join(value)
+            else:
+                value = ', '.join(value)
+            self.table.setItem(index, column, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+
+    def batch_finished(self):
+        failures = sum(1 for row in self.rows.values() if row["error"])
+        self.status_label.setText(f"Imported metadata for {len(self.rows) - failures} of {len(self.xci_paths)} XCIs\n\nDouble-click a row to fill the form with it")
+        self.export_button.setEnabled(bool(self.rows))
+
+    def use_row(self, index, column):
+        row = self.rows.get(index)
+        if not row or row["error"]:
+            return
+
+        self.parent().fill_metadata(metadata_fields(tuple(row[key] for key in TITLE_FIELDS)))
+        self.accept()
+
+    def export_titles(self):
+        output_path, _ = QFileDialog.getSaveFileName(self, "Export Titles", "titles.csv", "CSV Files (*.csv);;JSON Files (*.json)")
+        if not output_path:
+            return
+
+        try:
+            export_titles([self.rows[index] for index in sorted(self.rows)], output_path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", f"Could not write {output_path}: {str(e)}")
+            return
+        QMessageBox.information(self, "Titles Exported", f"Titles written to: {output_path}")
+
+    def done(self, result):
+        if self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().done(result)
+
 class ManualImportNXGameInfoDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -1577,6 +1779,10 @@ class GenerateFullXCIDialog(QDialog):
         self.drag_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.drag_drop_label)
 
+        self.fill_hashes_checkbox = QCheckBox("Hash output files and fill the File Info fields")
+        self.fill_hashes_checkbox.setChecked(True)
+        self.layout.addWidget(self.fill_hashes_checkbox)
+
         self.initial_area_path = None
         self.default_xci_path = None
 
@@ -1590,7 +1796,7 @@ class GenerateFullXCIDialog(QDialog):
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
             if self.state == 0:
-                if file_path.endswith('.bin') and os.path.getsize(file_path) == 512:
+                if file_path.endswith('.bin') and os.path.getsize(file_path) == INITIAL_AREA_SIZE:
                     self.initial_area_path = file_path
                     self.state = 1
                     self.drag_drop_label.setText("Drag and Drop Default XCI here to convert it to a FullXCI\n\nThe program will appear to freeze, it's just generating the FullXCI which can take a while\n\nCheck the terminal for the current status\n\nPlease be patient")
@@ -1598,7 +1804,12 @@ class GenerateFullXCIDialog(QDialog):
                     self.drag_drop_label.setText("Please drop an Initial Area .bin file that has a size of 512 bytes")
             elif self.state == 1:
                 if file_path.endswith('.xci'):
-                    if self.is_full_xci(file_path):
+                    try:
+                        full_xci = is_full_xci(file_path)
+                    except InvalidXCIError:
+                        QMessageBox.critical(self, "Invalid XCI", "No valid XCI header was found in this file")
+                        return
+                    if full_xci:
                         QMessageBox.critical(self, "Invalid XCI", "This is a FullXCI, please drag and drop a Default XCI")
                         return
                     else:
@@ -1610,48 +1821,16 @@ class GenerateFullXCIDialog(QDialog):
                 else:
                     self.drag_drop_label.setText("Please drop a .xci file")
 
-    def is_full_xci(self, file_path):
-        with open(file_path, 'rb') as file:
-            file.seek(0x1A0)
-            data_segment = file.read(96)
-
-        is_full_xci = all(b == 0 for b in data_segment)
-
-        return is_full_xci
-
     def generate_full_xci(self):
         default_xci_filename = os.path.basename(self.default_xci_path)
         full_xci_filename = os.path.splitext(default_xci_filename)[0] + " (Full XCI)" + os.path.splitext(default_xci_filename)[1]
         full_xci_path = os.path.join(os.path.dirname(self.default_xci_path), full_xci_filename)
 
         print("Generating XCI file...")
-        total_size = os.path.getsize(self.initial_area_path) + 3584 + os.path.getsize(self.default_xci_path)
-        processed_size = 0
-
-        with open(full_xci_path, 'wb') as full_xci:
-            with open(self.initial_area_path, 'rb') as initial_area:
-                while chunk := initial_area.read(4096):
-                    full_xci.write(chunk)
-                    processed_size += len(chunk)
-                    progress = (processed_size / total_size) * 100
-                    sys.stdout.write(f"\rWriting Initial Area... {progress:.0f}%")
-                    sys.stdout.flush()
-
-            full_xci.write(b'\x00' * 3584)
-            processed_size += 3584
-            progress = (processed_size / total_size) * 100
-            sys.stdout.write(f"\rWriting zeroes... {progress:.0f}%")
-            sys.stdout.flush()
-
-            with open(self.default_xci_path, 'rb') as default_xci:
-                while chunk := default_xci.read(4096):
-                    full_xci.write(chunk)
-                    processed_size += len(chunk)
-                    progress = (processed_size / total_size) * 100
-                    sys.stdout.write(f"\rWriting XCI... {progress:.0f}%")
-                    sys.stdout.flush()
-
-        print(f"\nFullXCI file generated: {full_xci_path}")
+        results = generate_full_xci_file(self.initial_area_path, self.default_xci_path, full_xci_path, self.fill_hashes_checkbox.isChecked(), cache_mode=self.parent().cache_mode_combo.currentText())
+        if results:
+            self.parent().fill_converted_hashes(results, self.initial_area_path, self.default_xci_path)
+
         os.startfile(os.path.dirname(full_xci_path))
         return full_xci_path
 
@@ -1667,6 +1846,10 @@ class TruncateFullXCIDialog(QDialog):
         self.drag_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.drag_drop_label)
 
+        self.fill_hashes_checkbox = QCheckBox("Hash output files and fill the File Info fields")
+        self.fill_hashes_checkbox.setChecked(True)
+        self.layout.addWidget(self.fill_hashes_checkbox)
+
         self.setAcceptDrops(True)
 
     def dragEnterEvent(self, event: QDragEnterEvent):
@@ -1677,66 +1860,33 @@ class TruncateFullXCIDialog(QDialog):
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
             if file_path.endswith('.xci'):
-                if self.is_full_xci(file_path):
+                try:
+                    full_xci = is_full_xci(file_path)
+                except InvalidXCIError:
+                    QMessageBox.critical(self, "Invalid XCI", "No valid XCI header was found in this file")
+                    return
+                if full_xci:
                     self.process_file(file_path)
                 else:
                     QMessageBox.critical(self, "Invalid XCI", "This is a Default XCI, please drag and drop a FullXCI")
             else:
                 self.drag_drop_label.setText("Please drop a .xci file")
 
-    def is_full_xci(self, file_path):
-        with open(file_path, 'rb') as file:
-            file.seek(0x1A0)
-            data_segment = file.read(96)
+    def process_file(self, file_path):
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        if base_name.endswith(" (Full XCI)"):
+            base_name = base_name[:-11]
 
-        is_full_xci = all(b == 0 for b in data_segment)
+        initial_area_path = os.path.join(os.path.dirname(file_path), f"{base_name} (Initial Area).bin")
+        default_xci_path = os.path.join(os.path.dirname(file_path), f"{base_name} (Default XCI).xci")
 
-        return is_full_xci
+        results = truncate_full_xci_file(file_path, initial_area_path, default_xci_path, self.fill_hashes_checkbox.isChecked(), cache_mode=self.parent().cache_mode_combo.currentText())
+        if results:
+            self.parent().fill_converted_hashes(results, initial_area_path, default_xci_path)
 
-    def process_file(self, file_path):
-        print(f"Starting FullXCI truncation for: {file_path}")
-        total_size = os.path.getsize(file_path)
-        processed_size = 0
-
-        with open(file_path, 'rb') as file:
-            initial_area = file.read(512)
-            processed_size += 512
-            progress = (processed_size / total_size) * 100
-            sys.stdout.write(f"\rRead Initial Area... {progress:.0f}%")
-            sys.stdout.flush()
-
-            file.seek(3584, os.SEEK_CUR)
-            processed_size += 3584
-            progress = (processed_size / total_size) * 100
-            sys.stdout.write(f"\rSkipped zero padding... {progress:.0f}%")
-            sys.stdout.flush()
-
-            base_name = os.path.splitext(os.path.basename(file_path))[0]
-            if base_name.endswith(" (Full XCI)"):
-                base_name = base_name[:-11]
-
-            initial_area_path = os.path.join(os.path.dirname(file_path), f"{base_name} (Initial Area).bin")
-            with open(initial_area_path, 'wb') as initial_area_file:
-                initial_area_file.write(initial_area)
-                print(f"\nInitial Area written to: {initial_area_path}")
-
-            default_xci_path = os.path.join(os.path.dirname(file_path), f"{base_name} (Default XCI).xci")
-
-            with open(default_xci_path, 'wb') as default_xci_file:
-                while True:
-                    chunk = file.read(4096)
-                    if not chunk:
-                        break
-                    default_xci_file.write(chunk)
-                    processed_size += len(chunk)
-                    progress = (processed_size / total_size) * 100
-                    sys.stdout.write(f"\rWriting XCI... {progress:.0f}%")
-                    sys.stdout.flush()
-
-            print(f"\nDefault XCI written to: {default_xci_path}")
-            QMessageBox.information(self, "Success", f"Default XCI file and Initial Area have been created:\n\n{default_xci_path}")
-            if platform.system() == "Windows":
-                self.accept()
+        QMessageBox.information(self, "Success", f"Default XCI file and Initial Area have been created:\n\n{default_xci_path}")
+        if platform.system() == "Windows":
+            self.accept()
 
 class GenerateCardIDDialog(QDialog):
     def __init__(self, parent=None):
@@ -1762,24 +1912,10 @@ class GenerateCardIDDialog(QDialog):
             self.process_file(file_path)
 
     def process_file(self, file_path):
-        with open(file_path, 'rb') as file:
-            card_id_hex = file.read().hex().upper()
-        card_id1 = card_id_hex[:8].upper()
-        card_id2 = card_id_hex[8:16].upper()
-        card_id3 = card_id_hex[16:24].upper()
-        crc32 = self.calculate_crc32(file_path).upper()
-        comment1 = f"Card ID 1: {card_id1}\nCard ID 2: {card_id2}\nCard ID 3: {card_id3}\nCRC32: {crc32}"
-        self.parent().source_details_inputs['Comment1'].setPlainText(comment1)
+        self.parent().source_details_inputs['Comment1'].setPlainText(card_id_comment(file_path))
         if platform.system() == "Windows":
             self.accept()
 
-    def calculate_crc32(self, file_path):
-        crc32 = 0
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                crc32 = zlib.crc32(chunk, crc32)
-        return format(crc32 & 0xFFFFFFFF, '08x')
-
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     window = XMLGeneratorApp()